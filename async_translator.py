@@ -0,0 +1,96 @@
+"""asyncio translation engine driving many concurrent requests from one event loop.
+
+Every job runs on the same process-wide loop in a background thread, so backends can keep one
+async client with a warm connection pool for the life of the process.
+"""
+import asyncio
+import threading
+from batch_translator import BatchTranslator
+from request_throttle import CANCEL_POLL_SECONDS, DEFAULT_ASYNC_MAX_CONCURRENCY, check_cancelled
+
+DEFAULT_ASYNC_MAX_IN_FLIGHT = DEFAULT_ASYNC_MAX_CONCURRENCY  # One document may use the whole asyncio ceiling
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """Return the process-wide event loop, running in a daemon thread started on first use."""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="translation-event-loop", daemon=True).start()
+        return _event_loop
+
+
+class AsyncBatchTranslator(BatchTranslator):
+    """BatchTranslator that sends its batches from one event loop instead of worker threads.
+
+    Requests go through the backend's async session; for Azure that is the SDK's async client,
+    whose HTTP transport is pluggable.
+    """
+
+    def __init__(self, backend, target_lang='en', progress_callback=None, max_in_flight=DEFAULT_ASYNC_MAX_IN_FLIGHT,
+                 translation_memory=None, throttle=None, text_type="plain", journal=None, skip_untranslatable=True,
+                 cancel_event=None, translation_slots=None):
+        super().__init__(backend, target_lang, progress_callback, translation_memory=translation_memory,
+                         throttle=throttle, text_type=text_type, journal=journal,
+                         skip_untranslatable=skip_untranslatable, cancel_event=cancel_event,
+                         translation_slots=translation_slots)
+        self.max_in_flight = max_in_flight
+
+    async def translate_batch_async(self, session, semaphore, batch):
+        """Send one request once a slot under the in-flight limit is free.
+
+        Returns the batch with either its translations or the error that stopped it.
+        """
+        texts, target_langs = batch
+        async with semaphore:
+            try:
+                translated_texts = await self.throttle.call_async(
+                    lambda: session.translate(texts, target_langs, self.text_type),
+                    sum(len(text) for text in texts) * len(target_langs),
+                    self.cancel_event
+                )
+                return batch, translated_texts, None
+            except Exception as e:
+                return batch, None, e
+
+    async def translate_unique_async(self, texts):
+        # Reuse stored translations and only send the rest to the service
+        translations, pending = self.lookup_memory(texts)
+        total_segments = len(texts)
+        translated_segments = total_segments - len(pending)
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        batches = self.make_batches(pending)
+        async with self.backend.open_async() as session:
+            tasks = {asyncio.ensure_future(self.translate_batch_async(session, semaphore, batch)) for batch in batches}
+            try:
+                while tasks:
+                    # Wake up regularly so a cancelled job stops without waiting for its slowest request
+                    done, tasks = await asyncio.wait(tasks, timeout=CANCEL_POLL_SECONDS,
+                                                     return_when=asyncio.FIRST_COMPLETED)
+                    check_cancelled(self.cancel_event)
+                    for task in done:
+                        batch, translated_texts, error = task.result()
+                        if error is None:
+                            self.record_batch(translations, batch, translated_texts)
+                        else:
+                            print(f"Error translating batch of {len(batch[0])} segments, Error: {error}")
+
+                        # Update progress after each request
+                        translated_segments += self.count_translations(batch)
+                        self.report_progress(translated_segments, total_segments)
+            finally:
+                # Abort the requests still pending or in flight before the session closes
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return translations
+
+    def translate_unique(self, texts):
+        """Run the whole document's requests on the shared event loop and wait for them."""
+        return asyncio.run_coroutine_threadsafe(self.translate_unique_async(texts), get_event_loop()).result()
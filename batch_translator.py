@@ -0,0 +1,217 @@
+"""Shared batching layer that packs many text segments into as few Translator requests as possible."""
+from contextlib import contextmanager
+from worker_pool import BoundedWorkQueue, DEFAULT_MAX_IN_FLIGHT
+from request_throttle import CANCEL_POLL_SECONDS, TranslationCancelled, check_cancelled, get_request_throttle
+from translation_metrics import get_metrics
+from segment_classifier import is_translatable
+
+# Azure Translator v3 limits for a single translate request
+MAX_ELEMENTS_PER_REQUEST = 1000
+MAX_CHARACTERS_PER_REQUEST = 50000
+
+
+def make_batches(texts, max_elements=MAX_ELEMENTS_PER_REQUEST, max_characters=MAX_CHARACTERS_PER_REQUEST):
+    """Split the indices of texts into batches that fit the per-request element and character limits."""
+    batches = []
+    current_batch = []
+    current_characters = 0
+
+    for index, text in enumerate(texts):
+        length = len(text)
+        if current_batch and (len(current_batch) >= max_elements or current_characters + length > max_characters):
+            batches.append(current_batch)
+            current_batch = []
+            current_characters = 0
+        current_batch.append(index)
+        current_characters += length
+
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
+def get_target_languages(target_lang):
+    """Return target_lang as a list, accepting a single language code or a list of them."""
+    return [target_lang] if isinstance(target_lang, str) else list(target_lang)
+
+
+class BatchTranslator:
+    """Translates segments into one or more target languages in the same batched requests.
+
+    target_lang is a language code or a list of them. Each request asks for every target
+    language at once, so segments are only sent and counted against the request limits once.
+
+    Setting cancel_event stops the job's pending and in-flight requests and raises TranslationCancelled.
+    translation_slots is an optional semaphore held while requests are sent, so a job queue can let
+    the next document parse while earlier ones translate.
+    """
+
+    def __init__(self, backend, target_lang='en', progress_callback=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 translation_memory=None, throttle=None, text_type="plain", journal=None, skip_untranslatable=True,
+                 cancel_event=None, translation_slots=None):
+        self.backend = backend
+        self.target_langs = get_target_languages(target_lang)
+        self.target_lang = self.target_langs[0]
+        self.text_type = text_type
+        self.progress_callback = progress_callback
+        self.work_queue = BoundedWorkQueue(max_in_flight)
+        self.translation_memory = translation_memory
+        self.throttle = throttle or get_request_throttle()
+        self.journal = journal
+        # Formulas, numbers, dates, URLs, codes and placeholders are passed through without a request
+        self.skip_untranslatable = skip_untranslatable
+        self.cancel_event = cancel_event
+        self.translation_slots = translation_slots
+        self.metrics = get_metrics()
+        self.failed_texts = set()  # Segments left untranslated because their request failed
+
+    def make_batches(self, texts):
+        """Pack texts into requests, returning a (texts, target languages) pair per request.
+
+        The character limit covers every target language of a request, so it is shared between
+        them. A text longer than its share could never be sent with every language at once, so
+        such texts get requests of their own, one target language at a time.
+        """
+        share = MAX_CHARACTERS_PER_REQUEST // len(self.target_langs)
+        regular_texts = [text for text in texts if len(text) <= share]
+        long_texts = [text for text in texts if len(text) > share]
+        batches = [([regular_texts[index] for index in batch], self.target_langs)
+                   for batch in make_batches(regular_texts, max_characters=share)]
+        for target_lang in self.target_langs:
+            batches += [([long_texts[index] for index in batch], [target_lang]) for batch in make_batches(long_texts)]
+        return batches
+
+    def translate_batch(self, batch):
+        """Send one request holding every text in a (texts, target languages) batch.
+
+        Returns a dict mapping each of the batch's target languages to the translations in order.
+        """
+        texts, target_langs = batch
+        return self.throttle.call(
+            lambda: self.backend.translate(texts, target_langs, self.text_type),
+            sum(len(text) for text in texts) * len(target_langs),
+            self.cancel_event
+        )
+
+    def translate(self, texts):
+        """Translate a list of segments into the first target language, returning the translations in order."""
+        return self.translate_all(texts)[self.target_lang]
+
+    def translate_all(self, texts):
+        """Translate a list of segments into every target language.
+
+        Returns a dict mapping each target language to the translations in the same order as texts.
+        Identical segments are translated once and the result is fanned back out to every
+        occurrence. Segments whose request fails keep their original text.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        self.metrics.increment("segments", len(texts))
+        self.metrics.increment("unique_segments", len(unique_texts))
+        translatable_texts = self.filter_untranslatable(unique_texts)
+
+        with self.hold_translation_slot(), self.metrics.timer("translate_seconds"):
+            translations = self.translate_unique(translatable_texts)
+        failed_texts = [text for text in translatable_texts
+                        if any(text not in translations[target_lang] for target_lang in self.target_langs)]
+        self.failed_texts.update(failed_texts)
+        self.metrics.increment("failed_segments", len(failed_texts))
+        return {target_lang: [translations[target_lang].get(text, text) for text in texts]
+                for target_lang in self.target_langs}
+
+    @contextmanager
+    def hold_translation_slot(self):
+        """Hold one of the job queue's translation slots, if there is one, while the body runs."""
+        if self.translation_slots is None:
+            yield
+            return
+        while not self.translation_slots.acquire(timeout=CANCEL_POLL_SECONDS):
+            check_cancelled(self.cancel_event)
+        try:
+            yield
+        finally:
+            self.translation_slots.release()
+
+    def filter_untranslatable(self, texts):
+        """Return the texts worth sending, recording what skipping the rest saved.
+
+        Skipped texts are left out of the translations, so they keep their original text.
+        """
+        if not self.skip_untranslatable:
+            return texts
+        translatable_texts = [text for text in texts if is_translatable(text, self.text_type)]
+        if len(translatable_texts) < len(texts):
+            # Requests saved are counted before the translation memory, which may have covered some anyway
+            skipped_characters = sum(map(len, texts)) - sum(map(len, translatable_texts))
+            self.metrics.increment("skipped_segments", len(texts) - len(translatable_texts))
+            self.metrics.increment("skipped_characters", skipped_characters * len(self.target_langs))
+            self.metrics.increment("requests_saved",
+                                   len(self.make_batches(texts)) - len(self.make_batches(translatable_texts)))
+        return translatable_texts
+
+    def lookup_memory(self, texts):
+        """Return the journaled and stored translations for texts and the texts that still need a request.
+
+        Translations are a dict of dicts, by target language and then source text. A text still
+        needs a request if any target language is missing it.
+        """
+        translations = {}
+        for target_lang in self.target_langs:
+            translations[target_lang] = {}
+            if self.journal is not None:
+                translations[target_lang].update(self.journal.lookup(texts, target_lang))
+            if self.translation_memory is not None:
+                remaining = [text for text in texts if text not in translations[target_lang]]
+                translations[target_lang].update(self.translation_memory.get_many(remaining, target_lang))
+        pending = [text for text in texts
+                   if any(text not in translations[target_lang] for target_lang in self.target_langs)]
+        self.metrics.increment("cache_hits", len(texts) - len(pending))
+        self.metrics.increment("cache_misses", len(pending))
+        return translations, pending
+
+    def record_batch(self, translations, batch, translated_texts):
+        """Add a finished batch to the translations, the checkpoint journal and the translation memory."""
+        texts, target_langs = batch
+        for target_lang in target_langs:
+            new_translations = dict(zip(texts, translated_texts[target_lang]))
+            translations[target_lang].update(new_translations)
+            if self.journal is not None:
+                self.journal.record(new_translations, target_lang)
+            if self.translation_memory is not None:
+                self.translation_memory.put_many(new_translations, target_lang)
+
+    def report_progress(self, translated_segments, total_segments):
+        if self.progress_callback:
+            progress = int((translated_segments / total_segments) * 100)
+            self.progress_callback(progress)
+
+    def count_translations(self, batch):
+        """Return how much of the progress a batch makes, in segments translated into every target language."""
+        texts, target_langs = batch
+        return len(texts) * len(target_langs) / len(self.target_langs)
+
+    def translate_unique(self, texts):
+        """Translate a list of distinct segments.
+
+        Returns a dict mapping each target language to a dict of each text and its translation.
+        """
+        # Reuse stored translations and only send the rest to the service
+        translations, pending = self.lookup_memory(texts)
+        total_segments = len(texts)
+        translated_segments = total_segments - len(pending)
+
+        # Requests run on the shared worker pool, at most max_in_flight at a time for this document
+        batches = self.work_queue.run(self.translate_batch, self.make_batches(pending), self.cancel_event)
+        for batch, future in batches:
+            try:
+                self.record_batch(translations, batch, future.result())
+            except TranslationCancelled:
+                break
+            except Exception as e:
+                print(f"Error translating batch of {len(batch[0])} segments, Error: {e}")
+
+            # Update progress after each request
+            translated_segments += self.count_translations(batch)
+            self.report_progress(translated_segments, total_segments)
+
+        check_cancelled(self.cancel_event)
+        return translations
@@ -0,0 +1,189 @@
+"""Throughput benchmark for the translators, run offline against the mock backend.
+
+Generates synthetic .docx, .xlsx and .pptx files of increasing size, translates each one in a
+fresh process and reports segments per second, requests per segment, peak RSS and wall time.
+
+With --startup it instead measures how long the GUI, the CLI and each translator take to
+import in a fresh interpreter, which is what a user waits for before the window appears.
+
+Example:
+    python benchmark.py --sizes 100 1000 10000 --latency 0.05 --json results.json
+    python benchmark.py --startup
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DOCUMENT_TYPES = ("docx", "xlsx", "pptx")
+SHAPES_PER_SLIDE = 5
+STARTUP_MODULES = ("gui", "cli", "word_translator", "excel_translator", "powerpoint_translator")
+STARTUP_RUNS = 5
+
+
+def synthetic_text(index):
+    return f"Segment {index} of the synthetic benchmark document, with enough words to look like a sentence."
+
+
+def generate_docx(path, segments):
+    from docx import Document
+    doc = Document()
+    for index in range(segments):
+        doc.add_paragraph(synthetic_text(index))
+    doc.save(path)
+
+
+def generate_xlsx(path, segments):
+    from openpyxl import Workbook
+    workbook = Workbook()
+    sheet = workbook.active
+    for index in range(segments):
+        sheet.cell(row=index + 1, column=1, value=synthetic_text(index))
+        sheet.cell(row=index + 1, column=2, value=index)
+    workbook.save(path)
+
+
+def generate_pptx(path, segments):
+    from pptx import Presentation
+    from pptx.util import Inches
+    presentation = Presentation()
+    blank_layout = presentation.slide_layouts[6]
+    slide = None
+    for index in range(segments):
+        if index % SHAPES_PER_SLIDE == 0:
+            slide = presentation.slides.add_slide(blank_layout)
+        top = Inches(1 + index % SHAPES_PER_SLIDE)
+        slide.shapes.add_textbox(Inches(1), top, Inches(8), Inches(1)).text_frame.text = synthetic_text(index)
+    presentation.save(path)
+
+
+GENERATORS = {"docx": generate_docx, "xlsx": generate_xlsx, "pptx": generate_pptx}
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB, or None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(document_type, input_path, output_path, segments, latency, error_rate, mock_quota, engine):
+    """Translate one synthetic document. Runs in its own process so peak RSS belongs to this case alone."""
+    from request_throttle import configure_request_throttle
+    from translation_backend import MockTranslatorBackend
+
+    # Measure the translators, not the client-side quota
+    configure_request_throttle(characters_per_minute=10 ** 12)
+    backend = MockTranslatorBackend(latency=latency, error_rate=error_rate, characters_per_minute=mock_quota)
+    options = {"use_translation_memory": False, "engine": engine, "backend": backend}
+
+    start = time.perf_counter()
+    if document_type == "docx":
+        from word_translator import WordTranslationApp
+        WordTranslationApp(input_path, output_path, "de", **options)
+    elif document_type == "xlsx":
+        from excel_translator import ExcelTranslationApp
+        ExcelTranslationApp(input_path, output_path, "de", **options)
+    else:
+        from powerpoint_translator import PowerPointTranslationApp
+        PowerPointTranslationApp(input_path, output_path, "de", **options)
+    wall_time = time.perf_counter() - start
+
+    return {
+        "type": document_type,
+        "segments": segments,
+        "requests": backend.request_count,
+        "wall_time_s": round(wall_time, 3),
+        "segments_per_s": round(segments / wall_time, 1) if wall_time else None,
+        "requests_per_segment": round(backend.request_count / segments, 4) if segments else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1) if resource is not None else None,
+    }
+
+
+def measure_import(module, runs=STARTUP_RUNS):
+    """Return the median seconds a fresh interpreter takes to import module, or None if it cannot be imported."""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    timings = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            return None
+        timings.append(float(completed.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def run_startup_benchmark(json_path=None):
+    results = []
+    print(f"{'module':<24}{'import ms':>12}")
+    for module in STARTUP_MODULES:
+        seconds = measure_import(module)
+        results.append({"module": module, "import_ms": round(seconds * 1000, 1) if seconds is not None else None})
+        print(f"{module:<24}{str(results[-1]['import_ms'] or 'unavailable'):>12}")
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the translators against the offline mock backend.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Segments per document")
+    parser.add_argument("--types", nargs="+", choices=DOCUMENT_TYPES, default=list(DOCUMENT_TYPES))
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests failing with a 500")
+    parser.add_argument("--mock-quota", type=int, help="Characters per minute the mock accepts before returning 429")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads")
+    parser.add_argument("--startup", action="store_true", help="Measure module import times instead of throughput")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.startup:
+        return run_startup_benchmark(args.json_path)
+
+    results = []
+    print(f"{'type':<6}{'segments':>10}{'requests':>10}{'req/seg':>10}{'seg/s':>12}{'wall s':>10}{'RSS MB':>10}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for document_type in args.types:
+            for segments in args.sizes:
+                input_path = os.path.join(work_dir, f"synthetic-{segments}.{document_type}")
+                output_path = os.path.join(work_dir, f"synthetic-{segments}-translated.{document_type}")
+                GENERATORS[document_type](input_path, segments)
+
+                # A freshly spawned process per case keeps each peak RSS measurement independent
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    result = pool.submit(run_case, document_type, input_path, output_path, segments,
+                                         args.latency, args.error_rate, args.mock_quota,
+                                         args.engine).result()
+                results.append(result)
+                print(f"{result['type']:<6}{result['segments']:>10}{result['requests']:>10}"
+                      f"{result['requests_per_segment']:>10}{result['segments_per_s']:>12}"
+                      f"{result['wall_time_s']:>10}{str(result['peak_rss_mb']):>10}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
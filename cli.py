@@ -0,0 +1,184 @@
+"""Headless command-line entry point for translating many documents without the GUI.
+
+Example:
+    python cli.py reports/ "decks/**/*.pptx" contract.docx --to de --output-dir translated --jobs 8
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from segment_manifest import get_manifest_path
+from request_throttle import (DEFAULT_ASYNC_MAX_CONCURRENCY, DEFAULT_CHARACTERS_PER_MINUTE, DEFAULT_MAX_CONCURRENCY,
+                              configure_request_throttle)
+from translation_metrics import get_metrics
+from translation_runner import (GENERATED_OUTPUT_PATTERN, SUPPORTED_TYPES, get_document_type, get_output_keys,
+                                get_output_path, run_translation_app)
+from worker_pool import DEFAULT_MAX_WORKERS, configure as configure_worker_pool
+
+
+def get_glob_root(pattern):
+    """Return the directory a glob pattern starts from: everything before its first wildcard."""
+    wildcard = re.search(r"[*?[]", pattern)
+    return os.path.dirname(pattern[:wildcard.start()]) or "."
+
+
+def find_documents(patterns):
+    """Expand files, directories and glob patterns into a sorted list of (document, input root) pairs.
+
+    The input root is the directory or glob prefix a document was found under, or a file's own
+    directory. Translations found in directories and globs, named like get_output_path's
+    outputs, are skipped so a second run does not translate them again.
+    """
+    documents = {}  # Document -> input root of the first pattern that found it
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = [os.path.join(root, name) for root, _, files in os.walk(pattern) for name in files]
+            input_root = pattern
+        elif glob.has_magic(pattern):
+            found = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+            input_root = get_glob_root(pattern)
+        else:
+            documents.setdefault(pattern, os.path.dirname(pattern) or ".")
+            continue
+        for path in found:
+            if not GENERATED_OUTPUT_PATTERN.search(path):
+                documents.setdefault(path, input_root)
+
+    # Skip Office lock files such as "~$report.docx"
+    return sorted((path, input_root) for path, input_root in documents.items()
+                  if get_document_type(path) in SUPPORTED_TYPES and not os.path.basename(path).startswith("~$"))
+
+
+def translate_file(input_path, output_path, target_lang, **options):
+    """Translate one document into one or more languages.
+
+    Returns the output paths, the number of segments left untranslated and the metrics recorded.
+    """
+    # Workers are reused across documents, so start every document from empty metrics
+    metrics = get_metrics()
+    metrics.reset()
+    app = run_translation_app(input_path, output_path, target_lang, **options)
+    if app.error is not None:
+        # Raised as a plain RuntimeError so it pickles back to the parent process whatever the original type
+        raise RuntimeError(str(app.error))
+    return list(app.output_paths.values()), len(app.failed_texts), metrics.snapshot()
+
+
+def init_worker(max_workers, characters_per_minute, process_count):
+    """Set up a worker process's shared request pool and throttle before it translates any document.
+
+    Every process throttles on its own, so each gets an equal share of the quota and of the
+    concurrency ceilings; together they stay within what the subscription allows.
+    """
+    configure_worker_pool(max_workers)
+    configure_request_throttle(characters_per_minute / process_count,
+                               max_concurrency=max(1, DEFAULT_MAX_CONCURRENCY // process_count),
+                               async_max_concurrency=max(1, DEFAULT_ASYNC_MAX_CONCURRENCY // process_count))
+
+
+def write_metrics(metrics, json_path=None, prometheus_path=None):
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as file:
+            file.write(metrics.to_json())
+    if prometheus_path:
+        with open(prometheus_path, 'w', encoding='utf-8') as file:
+            file.write(metrics.to_prometheus())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Translate Word, Excel and PowerPoint documents with Azure AI Translator.")
+    parser.add_argument("inputs", nargs="+", help="Documents, directories or glob patterns to translate")
+    parser.add_argument("-t", "--to", dest="target_langs", nargs="+", required=True,
+                        help="Target language codes, e.g. de or sr-Latn. Several languages share one parse and "
+                             "one set of requests and get an output each, e.g. report-translated.de.docx")
+    parser.add_argument("-o", "--output-dir", help="Directory for translated documents (default: next to each input)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Documents translated in parallel")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Concurrent requests across all documents of a worker process (threads engine)")
+    parser.add_argument("--characters-per-minute", type=int, default=DEFAULT_CHARACTERS_PER_MINUTE,
+                        help="Character quota of the Translator subscription, shared by all jobs "
+                             "(default: the free tier's)")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads", help="Request engine")
+    parser.add_argument("--no-memory", action="store_true", help="Do not use the translation memory")
+    parser.add_argument("--streaming", action="store_true", help="Stream large Excel workbooks (values only)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume interrupted jobs from the checkpoint journal next to each output")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep a segment manifest next to each output and only translate segments changed since it")
+    parser.add_argument("--metrics-json", help="Write the run's metrics to this file as JSON")
+    parser.add_argument("--metrics-prometheus", help="Write the run's metrics to this file in the Prometheus text format")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    documents = find_documents(args.inputs)
+    if not documents:
+        print("Error: No .docx, .xlsx or .pptx documents found.")
+        return 1
+
+    # Check every output before starting, so no document overwrites another's translation
+    document_outputs = {input_path: get_output_path(input_path, args.output_dir, input_root)
+                        for input_path, input_root in documents}
+    writers = {}  # Normalized output path -> document that writes it
+    for input_path, output_path in document_outputs.items():
+        for output_key in get_output_keys(output_path, args.target_langs):
+            if output_key in writers:
+                print(f"Error: {writers[output_key]} and {input_path} would both be translated to {output_key}.")
+                return 1
+            writers[output_key] = input_path
+
+    failures = 0
+    partial = 0  # Documents saved with some segments left untranslated
+    metrics = get_metrics()
+    process_count = max(1, min(args.jobs, len(documents)))
+    with ProcessPoolExecutor(max_workers=process_count, initializer=init_worker,
+                             initargs=(args.workers, args.characters_per_minute, process_count)) as pool:
+        futures = {}
+        for input_path, output_path in document_outputs.items():
+            options = {"use_translation_memory": not args.no_memory, "engine": args.engine, "resume": args.resume}
+            if get_document_type(input_path) == "xlsx":
+                options["streaming"] = args.streaming
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            if args.incremental:
+                manifest_path = get_manifest_path(output_path)
+                options["manifest_path"] = manifest_path
+                if os.path.exists(manifest_path):
+                    options["previous_manifest_path"] = manifest_path
+            futures[pool.submit(translate_file, input_path, output_path, args.target_langs, **options)] = input_path
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            input_path = futures[future]
+            try:
+                output_paths, failed_count, document_metrics = future.result()
+                metrics.merge(document_metrics)
+                if failed_count:
+                    partial += 1
+                    print(f"[{done}/{len(documents)}] {input_path} -> {', '.join(output_paths)} "
+                          f"({failed_count} segments could not be translated)")
+                else:
+                    print(f"[{done}/{len(documents)}] {input_path} -> {', '.join(output_paths)}")
+            except Exception as e:
+                failures += 1
+                print(f"[{done}/{len(documents)}] Error translating {input_path}: {e}")
+
+    print(f"Translated {len(documents) - failures - partial} of {len(documents)} documents.")
+    if partial:
+        print(f"{partial} documents were saved with untranslated segments; run again with --resume to retry them.")
+    counters = metrics.snapshot()["counters"]
+    if counters['segments']:
+        print(f"{counters['segments']} segments, {counters['unique_segments']} unique "
+              f"({1 - counters['unique_segments'] / counters['segments']:.0%} deduplicated).")
+    print(f"{counters['requests']} requests, {counters['characters_sent']} characters sent, "
+          f"{counters['retries']} retries, {counters['cache_hits']} cache hits, "
+          f"{counters['failed_segments']} failed segments.")
+    print(f"Skipped {counters['skipped_segments']} non-translatable segments, saving "
+          f"{counters['skipped_characters']} characters and {counters['requests_saved']} requests.")
+    write_metrics(metrics, args.metrics_json, args.metrics_prometheus)
+    return 1 if failures or partial else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Base class of the Word, Excel and PowerPoint translators.
+
+DocumentTranslationApp holds what the three translators have in common: their options, the
+batch translator for the configured engine, the checkpoint journal and writing one output
+per target language.
+"""
+import os
+from contextlib import contextmanager
+from batch_translator import BatchTranslator, get_target_languages
+from request_throttle import TranslationCancelled
+from translation_metrics import ProgressCoalescer, get_metrics
+from translation_memory import get_translation_memory
+from translation_journal import TranslationJournal, get_journal_path
+from segment_manifest import SegmentManifest, save_manifest, translate_incrementally
+from inline_markup import build_tagged_segment, get_run_text, write_tagged_segment
+
+
+def get_language_output_paths(output_path, target_langs):
+    """Return a dict mapping each target language to its output file.
+
+    A single language writes to output_path itself; several languages get the language code
+    inserted before the extension, e.g. report-translated.de.docx.
+    """
+    if len(target_langs) == 1:
+        return {target_langs[0]: output_path}
+    base, extension = os.path.splitext(output_path)
+    return {target_lang: f"{base}.{target_lang}{extension}" for target_lang in target_langs}
+
+
+class DocumentTranslationApp:
+    """Base class of the Word, Excel and PowerPoint translators.
+
+    Subclasses extract (locator, text_runs) segments from their documents; this class translates
+    them into every target language and writes one output per language. Translation starts
+    from the subclass's constructor once everything is set up.
+    """
+
+    document_name = "Document"  # How the saved output is described in messages
+
+    def __init__(self, input_path, output_path, target_lang="en", progress_callback=None, use_translation_memory=True,
+                 engine="threads", backend=None,
+                 previous_manifest_path=None, manifest_path=None, resume=False,
+                 cancel_event=None, translation_slots=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.target_language_code = target_lang
+        # Several target languages share one parse and one set of requests, with an output per language
+        self.output_paths = get_language_output_paths(output_path, get_target_languages(target_lang))
+        # Progress events are coalesced so the GUI is not flooded on large documents
+        self.progress_callback = ProgressCoalescer(progress_callback) if progress_callback else None
+        self.metrics = get_metrics()
+
+        # Translation backend, the shared Azure AI Translator client unless another one is passed in
+        if backend is None:
+            # Imported here so loading the translators does not load the Azure SDK
+            from translation_backend import get_translation_backend
+            backend = get_translation_backend()
+        self.backend = backend
+
+        # Reuse translations stored by earlier runs
+        self.translation_memory = get_translation_memory() if use_translation_memory else None
+
+        # "threads" sends requests from the shared worker pool, "asyncio" from a single event loop
+        self.engine = engine
+
+        # Incremental mode: copy over segments unchanged since a previous run and record this run's segments
+        self.previous_manifest = SegmentManifest.load(previous_manifest_path) if previous_manifest_path else None
+        self.manifest_path = manifest_path
+
+        # Finished segments are checkpointed to a journal next to the output; resume replays it
+        self.resume = resume
+        self.journal = None
+        self.translator = None
+
+        # Job queue hooks: cancel_event stops this job's requests and translation_slots
+        # limits how many jobs send requests at the same time
+        self.cancel_event = cancel_event
+        self.translation_slots = translation_slots
+
+        # Outcome of the run, for callers to report: the exception that stopped it, if any, and the
+        # segments left untranslated because their request failed
+        self.error = None
+        self.failed_texts = set()
+
+    def has_required_options(self):
+        if not self.input_path or not self.output_path or not self.target_language_code:
+            self.error = ValueError("Please provide all required paths and target language.")
+            print(f"Error: {self.error}")
+            return False
+        return True
+
+    def create_translator(self, target_lang='en', text_type="plain"):
+        """Return the batch translator for the configured engine."""
+        options = {"translation_memory": self.translation_memory, "journal": self.journal, "text_type": text_type,
+                   "cancel_event": self.cancel_event, "translation_slots": self.translation_slots}
+        if self.engine == "asyncio":
+            # Imported here because the asyncio engine builds on this module
+            from async_translator import AsyncBatchTranslator
+            self.translator = AsyncBatchTranslator(self.backend, target_lang, self.progress_callback, **options)
+        else:
+            self.translator = BatchTranslator(self.backend, target_lang, self.progress_callback, **options)
+        return self.translator
+
+    @contextmanager
+    def journaled_run(self):
+        """Run the body with the checkpoint journal open, recording cancellation and errors in self.error instead of raising.
+
+        The journal is removed once the body completes with every segment translated. It is kept
+        after a cancellation or an error, so the job can be resumed later.
+        """
+        self.journal = TranslationJournal(get_journal_path(self.output_path), resume=self.resume)
+        try:
+            yield
+            self.failed_texts = self.translator.failed_texts
+            self.journal.finish(self.failed_texts)
+        except TranslationCancelled as e:
+            self.error = e
+            print(f"Translation of {self.input_path} was cancelled.")
+        except Exception as e:
+            self.error = e
+            print(f"Error: An error occurred: {e}")
+            if self.progress_callback:
+                self.progress_callback(0)  # Reset progress in case of error
+        finally:
+            self.journal.close()
+
+    def translate_segments(self, segments):
+        """Translate (locator, text_runs) segments in batched requests, with a span per run.
+
+        Returns a dict mapping each target language to the translated segments in order.
+        """
+        tagged_segments = [build_tagged_segment([get_run_text(text_elements) for text_elements in text_runs])
+                           for _, text_runs in segments]
+        locators = [locator for locator, _ in segments]
+        translator = self.create_translator(self.target_language_code, text_type="html")
+        translated_segments = translate_incrementally(translator, locators, tagged_segments, self.previous_manifest)
+        if self.manifest_path:
+            save_manifest(self.manifest_path, translator, locators, tagged_segments, translated_segments)
+        return translated_segments
+
+    def save_translations(self, package, segments, translated_segments, preserve_space=False):
+        """Write each language's translations into the parsed package in place and save it to that language's output."""
+        for target_lang, output_path in self.output_paths.items():
+            with self.metrics.timer("write_back_seconds"):
+                for (_, text_runs), translated_segment in zip(segments, translated_segments[target_lang]):
+                    write_tagged_segment(text_runs, translated_segment, preserve_space=preserve_space)
+            with self.metrics.timer("save_seconds"):
+                package.save(output_path)
+            self.metrics.increment("documents")
+            self.report_saved(output_path)
+
+    def report_saved(self, output_path):
+        if self.translator.failed_texts:
+            print(f"{self.document_name} has been saved as {output_path} with "
+                  f"{len(self.translator.failed_texts)} segments left untranslated.")
+        else:
+            print(f"{self.document_name} has been translated and saved as {output_path}.")
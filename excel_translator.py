@@ -1,94 +1,170 @@
-import threading
-from openpyxl import load_workbook
-from azure.ai.translation.text import TextTranslationClient
-from azure.core.credentials import AzureKeyCredential
-
-class ExcelTranslationApp:
-    def __init__(self, input_path, output_path, target_lang="en", progress_callback=None):
-        self.input_path = input_path
-        self.output_path = output_path
-        self.target_language_code = target_lang
-        self.progress_callback = progress_callback
-
-        # Set up Azure Translator credentials
-        self.endpoint = "https://api.cognitive.microsofttranslator.com/"
-        key_path = "key.txt"  # The file holding the translator key
-        with open(key_path, 'r', encoding='utf-8') as file:
-            self.subscription_key = file.read()
-        self.region = "westeurope"
-        self.client = TextTranslationClient(
-            endpoint=self.endpoint,
-            credential=AzureKeyCredential(self.subscription_key),
-            headers={"Ocp-Apim-Subscription-Region": self.region}
-        )
+from concurrent.futures import ThreadPoolExecutor
+from document_translator import DocumentTranslationApp
+from ooxml_package import OOXMLPackage
+
+STREAMING_CHUNK_ROWS = 1000  # Rows read, translated and written together in streaming mode
+
+S_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+S_STRING_ITEM = f"{{{S_NAMESPACE}}}si"
+S_INLINE_STRING = f"{{{S_NAMESPACE}}}is"
+S_CELL = f"{{{S_NAMESPACE}}}c"
+S_RUN = f"{{{S_NAMESPACE}}}r"
+S_TEXT = f"{{{S_NAMESPACE}}}t"
+SHARED_STRINGS_CONTENT_TYPE = "spreadsheetml.sharedStrings+xml"
+WORKSHEET_CONTENT_TYPE = "spreadsheetml.worksheet+xml"
+
+
+class ExcelTranslationApp(DocumentTranslationApp):
+    document_name = "Excel file"
+
+    def __init__(self, input_path, output_path, target_lang="en", progress_callback=None, streaming=False, **options):
+        super().__init__(input_path, output_path, target_lang, progress_callback, **options)
+
+        # Stream rows through read-only and write-only workbooks to keep memory flat on huge files
+        self.streaming = streaming
 
         # Start the translation process
         self.translate_excel_file()
 
-    def translate_cell(self, cell, target_lang='en', progress_counter=None, total_cells=None):
-        if cell.value:
-            # Check if the value is a string, if not, skip the cell
-            if isinstance(cell.value, str):
-                original_text = cell.value
-                try:
-                    response = self.client.translate(
-                        body=[original_text], to_language=[target_lang]
-                    )
-                    translated_text = response[0].translations[0].text
-                    print(f"Translated text: {translated_text}")
-
-                    # Update the cell value with translated text
-                    cell.value = translated_text
-                except Exception as e:
-                    print(f"Error translating cell value: {original_text}, Error: {e}")
-            else:
-                print(f"Skipping non-string cell value: {cell.value} (Type: {type(cell.value)})")
-
-            # Update progress
-            if progress_counter is not None and total_cells is not None:
-                progress_counter[0] += 1  # Increment the counter
-                if self.progress_callback:
-                    progress = int((progress_counter[0] / total_cells) * 100)
-                    self.progress_callback(progress)
-
-    def process_sheet(self, sheet, target_lang='en'):
-        threads = []
-        total_cells = sum(1 for row in sheet.iter_rows() for cell in row if isinstance(cell.value, str))
-        progress_counter = [0]  # Using a list to allow mutable counter in threads
-
-        # Iterate through all rows and columns in the sheet
-        for row in sheet.iter_rows():
-            for cell in row:
-                if isinstance(cell.value, str):  # Only process cells with text
-                    # Create a new thread to handle translation
-                    thread = threading.Thread(target=self.translate_cell,
-                                              args=(cell, target_lang, progress_counter, total_cells))
-                    threads.append(thread)
-                    thread.start()
-
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+    def get_text_runs(self, string_item):
+        """Return the text elements of a shared or inline string, one list per run.
+
+        A plain string is a single t element; rich text has an r element per formatted run.
+        Phonetic guides (rPh) are not part of the displayed text and are left alone.
+        """
+        runs = string_item.findall(S_RUN)
+        if not runs:
+            text_elements = string_item.findall(S_TEXT)
+            return [text_elements] if any(element.text for element in text_elements) else []
+        return [text_elements for text_elements in (run.findall(S_TEXT) for run in runs)
+                if any(element.text for element in text_elements)]
+
+    def extract_segments(self, package):
+        """Collect one segment per shared string and per inline string cell.
+
+        Text cells point into the shared-string table, so each distinct string is translated once
+        however many cells use it and the sheets themselves are not touched. Worksheets are scanned
+        a chunk at a time and only parsed if they contain inline strings. Each segment is a
+        (locator, text_runs) pair.
+        """
+        segments = []
+        for part_name in package.find_parts(SHARED_STRINGS_CONTENT_TYPE):
+            for index, string_item in enumerate(package.load_part(part_name).iter(S_STRING_ITEM)):
+                text_runs = self.get_text_runs(string_item)
+                if text_runs:
+                    segments.append((f"{part_name}#{index}", text_runs))
+
+        for part_name in package.find_parts(WORKSHEET_CONTENT_TYPE):
+            if not package.part_contains(part_name, b"inlineStr"):
+                continue
+            for cell in package.load_part(part_name).iter(S_CELL):
+                inline_string = cell.find(S_INLINE_STRING)
+                if cell.get("t") != "inlineStr" or inline_string is None:
+                    continue
+                text_runs = self.get_text_runs(inline_string)
+                if text_runs:
+                    segments.append((f"{part_name}!{cell.get('r')}", text_runs))
+        return segments
 
     def translate_excel_file(self):
-        if not self.input_path or not self.output_path or not self.target_language_code:
-            print("Error: Please provide all required paths and target language.")
+        if not self.has_required_options():
             return
 
-        try:
-            # Load the Excel file
-            workbook = load_workbook(self.input_path)
-
-            # Process each sheet in the workbook
-            for sheet_name in workbook.sheetnames:
-                current_sheet = workbook[sheet_name]
-                print(f"Translating sheet: {sheet_name}")
-                self.process_sheet(current_sheet, self.target_language_code)
-
-            # Save the translated workbook
-            workbook.save(self.output_path)
-            print(f"Excel file has been translated and saved as {self.output_path}.")
-        except Exception as e:
-            print(f"Error: An error occurred: {e}")
-            if self.progress_callback:
-                self.progress_callback(0)  # Reset progress in case of error
+        if self.streaming:
+            self.translate_excel_file_streaming()
+            return
+
+        with self.journaled_run():
+            # Collect the shared-string table and any inline strings; cells, styles, charts and drawings stay as they are
+            with self.metrics.timer("parse_seconds"):
+                package = OOXMLPackage(self.input_path)
+                segments = self.extract_segments(package)
+
+            # Translate every string together in batched requests, with a span per rich-text run
+            translated_segments = self.translate_segments(segments)
+
+            # The parsed package is reused for every language: write each string back in place, then save
+            self.save_translations(package, segments, translated_segments, preserve_space=True)
+
+    def translate_rows(self, rows, translator):
+        """Translate every text value in a chunk of rows and return a translated copy of the chunk per target language."""
+        positions = [(row, column) for row in range(len(rows)) for column in range(len(rows[row]))
+                     if isinstance(rows[row][column], str) and rows[row][column]]
+        translations = translator.translate_all([rows[row][column] for row, column in positions])
+        translated_chunks = {}
+        for target_lang, translated_texts in translations.items():
+            translated_rows = [list(row) for row in rows]
+            for (row, column), translated_text in zip(positions, translated_texts):
+                translated_rows[row][column] = translated_text
+            translated_chunks[target_lang] = translated_rows
+        return translated_chunks
+
+    def translate_excel_file_streaming(self):
+        """Translate the workbook row chunk by row chunk without holding it in memory.
+
+        Only cell values are carried over, so this mode is meant for values-only sheets.
+        The next chunk is read while the previous one is being translated. Segment manifests
+        are not used in this mode.
+        """
+        # openpyxl is only needed for streaming, so it is imported here
+        from openpyxl import load_workbook, Workbook
+
+        source_workbook = None
+        with self.journaled_run():
+            source_workbook = load_workbook(self.input_path, read_only=True)
+            target_workbooks = {target_lang: Workbook(write_only=True) for target_lang in self.output_paths}
+            translator = self.create_translator(self.target_language_code)
+            translator.progress_callback = None  # Progress is reported per chunk of rows instead
+
+            total_rows = sum(source_workbook[sheet_name].max_row or 0 for sheet_name in source_workbook.sheetnames)
+            processed_rows = 0
+
+            with ThreadPoolExecutor(max_workers=1) as pipeline:
+                for sheet_name in source_workbook.sheetnames:
+                    print(f"Translating sheet: {sheet_name}")
+                    target_sheets = {target_lang: target_workbook.create_sheet(sheet_name)
+                                     for target_lang, target_workbook in target_workbooks.items()}
+                    pending_chunk = None
+                    chunk = []
+
+                    for row in source_workbook[sheet_name].iter_rows(values_only=True):
+                        chunk.append(list(row))
+                        if len(chunk) < STREAMING_CHUNK_ROWS:
+                            continue
+                        # Translate this chunk while the previous one is written out
+                        future = pipeline.submit(self.translate_rows, chunk, translator)
+                        if pending_chunk is not None:
+                            processed_rows += self.write_rows(target_sheets, pending_chunk.result())
+                            self.report_progress(processed_rows, total_rows)
+                        pending_chunk = future
+                        chunk = []
+
+                    if pending_chunk is not None:
+                        processed_rows += self.write_rows(target_sheets, pending_chunk.result())
+                    if chunk:
+                        processed_rows += self.write_rows(target_sheets, self.translate_rows(chunk, translator))
+                    self.report_progress(processed_rows, total_rows)
+
+            # Save the translated workbooks
+            for target_lang, output_path in self.output_paths.items():
+                with self.metrics.timer("save_seconds"):
+                    target_workbooks[target_lang].save(output_path)
+                self.metrics.increment("documents")
+                self.report_saved(output_path)
+        # The journaled run reports errors instead of raising, so the source workbook is always closed here
+        if source_workbook is not None:
+            source_workbook.close()
+
+    def write_rows(self, sheets, translated_chunks):
+        """Append each language's translated chunk to its write-only sheet and return how many rows were written."""
+        row_count = 0
+        for target_lang, rows in translated_chunks.items():
+            for row in rows:
+                sheets[target_lang].append(row)
+            row_count = len(rows)
+        return row_count
+
+    def report_progress(self, processed_rows, total_rows):
+        if self.progress_callback and total_rows:
+            progress = min(100, int((processed_rows / total_rows) * 100))
+            self.progress_callback(progress)
@@ -1,12 +1,13 @@
 import sys
 import os
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtGui import QIcon
-from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QComboBox, QTextEdit, QLabel, \
-    QProgressBar, QFileDialog
-from word_translator import WordTranslationApp
-from excel_translator import ExcelTranslationApp
-from powerpoint_translator import PowerPointTranslationApp
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QTextEdit, \
+    QLabel, QProgressBar, QFileDialog, QSpinBox, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from translation_runner import get_output_keys, get_output_path
+from job_queue import TranslationJob, TranslationJobQueue, DEFAULT_CONCURRENT_JOBS, QUEUED, RUNNING, \
+    FAILED, CANCELLED
+from request_throttle import DEFAULT_CHARACTERS_PER_MINUTE, get_request_throttle
 
 LANGUAGE_CODES = {
     # Major Languages
@@ -31,52 +32,23 @@ LANGUAGE_CODES = {
 }
 
 
-class TranslationThread(QThread):
-    progress_updated = pyqtSignal(int)
-    message_updated = pyqtSignal(str)
-
-    def __init__(self, input_path, output_path, target_lang, document_type):
-        super().__init__()
-        self.input_path = input_path
-        self.output_path = output_path
-        self.target_lang = target_lang
-        self.document_type = document_type
-
-    def run(self):
-        try:
-            def progress_callback(progress):
-                self.progress_updated.emit(progress)
-
-            # Perform translation based on document type
-            if self.document_type == "docx":
-                WordTranslationApp(input_path=self.input_path, output_path=self.output_path,
-                                   target_lang=self.target_lang, progress_callback=progress_callback)
-            elif self.document_type == "xlsx":
-                ExcelTranslationApp(input_path=self.input_path, output_path=self.output_path,
-                                    target_lang=self.target_lang, progress_callback=progress_callback)
-            elif self.document_type == "pptx":
-                PowerPointTranslationApp(input_path=self.input_path, output_path=self.output_path,
-                                         target_lang=self.target_lang, progress_callback=progress_callback)
-
-            self.message_updated.emit(f"Document translated successfully to {self.output_path}")
-            self.progress_updated.emit(100)
-        except Exception as e:
-            self.message_updated.emit(f"Error: {str(e)}")
-            self.progress_updated.emit(0)
-
-
 class TranslationApp(QWidget):
+    job_updated = pyqtSignal(object, str)  # (job, message), emitted from job threads and handled on the GUI thread
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Document Translator')
         self.setGeometry(100, 100, 400, 500)
         self.setWindowIcon(QIcon("icon.ico"))
 
-        self.translation_thread = None
-        self.document_type = ""
-        self.document_path = ""
+        self.document_paths = []
         self.folder_path = ""
 
+        # Documents are translated by a job queue; its updates reach the GUI thread through job_updated
+        self.job_updated.connect(self.update_job)
+        self.job_queue = TranslationJobQueue(DEFAULT_CONCURRENT_JOBS, update_callback=self.job_updated.emit)
+        self.jobs = []  # Every submitted job, in the order of the job table's rows
+
         layout = QVBoxLayout()
 
         # Initialize language dropdowns
@@ -93,7 +65,7 @@ class TranslationApp(QWidget):
         layout.addWidget(self.to_language_dropdown)
 
         # Document selection buttons
-        self.select_document_button = QPushButton('Select Document')
+        self.select_document_button = QPushButton('Select Documents')
         self.select_document_button.clicked.connect(self.select_document)
         layout.addWidget(self.select_document_button)
 
@@ -101,10 +73,48 @@ class TranslationApp(QWidget):
         self.select_folder_button.clicked.connect(self.select_target_destination)
         layout.addWidget(self.select_folder_button)
 
+        # Number of documents translated at the same time
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("Documents at once"))
+        self.concurrency_spin_box = QSpinBox()
+        self.concurrency_spin_box.setRange(1, 8)
+        self.concurrency_spin_box.setValue(DEFAULT_CONCURRENT_JOBS)
+        self.concurrency_spin_box.valueChanged.connect(self.job_queue.set_max_concurrent_jobs)
+        concurrency_layout.addWidget(self.concurrency_spin_box)
+        layout.addLayout(concurrency_layout)
+
+        # Character quota of the Translator subscription, the free tier's unless a paid tier allows more
+        quota_layout = QHBoxLayout()
+        quota_layout.addWidget(QLabel("Characters per minute"))
+        self.quota_spin_box = QSpinBox()
+        self.quota_spin_box.setRange(1000, 10000000)
+        self.quota_spin_box.setSingleStep(1000)
+        self.quota_spin_box.setValue(DEFAULT_CHARACTERS_PER_MINUTE)
+        self.quota_spin_box.valueChanged.connect(self.set_characters_per_minute)
+        quota_layout.addWidget(self.quota_spin_box)
+        layout.addLayout(quota_layout)
+
         self.translate_button = QPushButton('Translate')
         self.translate_button.clicked.connect(self.translate_document)
         layout.addWidget(self.translate_button)
 
+        # Job table with the status and progress of every document
+        self.job_table = QTableWidget(0, 3, self)
+        self.job_table.setHorizontalHeaderLabels(["Document", "Status", "Progress"])
+        self.job_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.job_table)
+
+        cancel_layout = QHBoxLayout()
+        self.cancel_selected_button = QPushButton('Cancel Selected')
+        self.cancel_selected_button.clicked.connect(self.cancel_selected_jobs)
+        cancel_layout.addWidget(self.cancel_selected_button)
+        self.cancel_all_button = QPushButton('Cancel All')
+        self.cancel_all_button.clicked.connect(self.job_queue.cancel_all)
+        cancel_layout.addWidget(self.cancel_all_button)
+        layout.addLayout(cancel_layout)
+
         # Text area for translation progress messages
         self.text_box = QTextEdit(self)
         self.text_box.setPlaceholderText("The translation progress will appear here...")
@@ -122,31 +132,34 @@ class TranslationApp(QWidget):
         self.setLayout(layout)
 
     def select_document(self):
-        """Open a file dialog to select the input document and store its path."""
+        """Open a file dialog to select the input documents and store their paths."""
         file_dialog = QFileDialog(self)
-        file_dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+        file_dialog.setFileMode(QFileDialog.FileMode.ExistingFiles)
         file_dialog.setNameFilter("Documents (*.docx *.xlsx *.pptx)")
 
         if file_dialog.exec():
-            selected_file = file_dialog.selectedFiles()[0]
-            self.document_type = selected_file.split('.')[-1].lower()
-            if selected_file:
-                self.document_path = selected_file
-                self.text_box.append(f"Selected document: {self.document_path}")
+            self.document_paths = file_dialog.selectedFiles()
+            if self.document_paths:
+                for document_path in self.document_paths:
+                    self.text_box.append(f"Selected document: {document_path}")
             else:
                 self.text_box.append("No document selected.")
 
     def select_target_destination(self):
-        """Open a dialog to select the target destination (file)."""
+        """Open a dialog to select the target destination: a file for one document, a folder for several."""
+        if len(self.document_paths) > 1:
+            selected_folder = QFileDialog.getExistingDirectory(self, "Select Target Folder")
+            if selected_folder:
+                self.folder_path = selected_folder
+                self.text_box.append(f"Selected output folder: {self.folder_path}")
+            return
+
         file_dialog = QFileDialog(self)
         file_dialog.setFileMode(QFileDialog.FileMode.AnyFile)
-        if self.document_path:
-            base_name = os.path.splitext(os.path.basename(self.document_path))[0]
-            default_file_name = f"{base_name}-translated.{self.document_type}"
+        if self.document_paths:
+            file_dialog.selectFile(os.path.basename(get_output_path(self.document_paths[0])))
         else:
-            default_file_name = f"translated.{self.document_type}"
-
-        file_dialog.selectFile(default_file_name)
+            file_dialog.selectFile("translated")
 
         if file_dialog.exec():
             selected_file = file_dialog.selectedFiles()[0]
@@ -154,20 +167,67 @@ class TranslationApp(QWidget):
             self.text_box.append(f"Selected output path: {self.folder_path}")
 
     def translate_document(self):
-        """Start translation in a separate thread."""
+        """Queue a translation job for every selected document."""
         selected_to_lang = self.to_language_dropdown.currentText()
         to_lang_code = LANGUAGE_CODES.get(selected_to_lang, "en")
 
-        if self.document_path and self.folder_path:
-            self.progress_bar.setValue(0)  # Reset progress bar
-            self.translation_thread = TranslationThread(self.document_path, self.folder_path, to_lang_code,
-                                                        self.document_type)
-            self.translation_thread.progress_updated.connect(self.update_progress)
-            self.translation_thread.message_updated.connect(self.update_message)
-            self.translation_thread.start()
+        if self.document_paths and self.folder_path:
+            # Outputs of jobs that have not finished yet, which no new job may write too
+            busy_outputs = set()
+            for job in self.jobs:
+                if job.status in (QUEUED, RUNNING):
+                    busy_outputs |= get_output_keys(job.output_path, job.target_lang)
+
+            for document_path in self.document_paths:
+                if len(self.document_paths) == 1:
+                    output_path = self.folder_path
+                else:
+                    output_path = get_output_path(document_path, self.folder_path)
+                output_keys = get_output_keys(output_path, to_lang_code)
+                if output_keys & busy_outputs:
+                    self.text_box.append(f"<font color='red'>Skipped {document_path}: another job is already "
+                                         f"writing {output_path}.")
+                    continue
+                busy_outputs |= output_keys
+                self.add_job(TranslationJob(document_path, output_path, to_lang_code))
+            self.document_paths = []
+            self.folder_path = ""
         else:
             self.text_box.append("<font color='red'>Please select both input and output paths.")
 
+    def add_job(self, job):
+        row = self.job_table.rowCount()
+        self.job_table.insertRow(row)
+        self.job_table.setItem(row, 0, QTableWidgetItem(os.path.basename(job.input_path)))
+        self.job_table.setItem(row, 1, QTableWidgetItem(job.status))
+        progress_bar = QProgressBar(self.job_table)
+        progress_bar.setRange(0, 100)
+        self.job_table.setCellWidget(row, 2, progress_bar)
+        self.jobs.append(job)
+        self.job_queue.submit(job)
+
+    def set_characters_per_minute(self, characters_per_minute):
+        """Apply the quota to the shared request throttle, including jobs already running."""
+        get_request_throttle().set_characters_per_minute(characters_per_minute)
+
+    def cancel_selected_jobs(self):
+        for index in sorted({index.row() for index in self.job_table.selectedIndexes()}):
+            job = self.jobs[index]
+            if job.status in (QUEUED, RUNNING):
+                self.job_queue.cancel(job)
+                self.text_box.append(f"Cancelling {job.input_path}")
+
+    def update_job(self, job, message):
+        """Show a job's status and progress in its row and any message it sent, and refresh the overall progress."""
+        row = self.jobs.index(job)
+        self.job_table.item(row, 1).setText(job.status)
+        self.job_table.cellWidget(row, 2).setValue(job.progress)
+        if message:
+            self.update_message(f"{os.path.basename(job.input_path)}: {message}")
+        # Cancelled and failed jobs will never finish, so they do not count toward the overall progress
+        jobs = [job for job in self.jobs if job.status not in (FAILED, CANCELLED)]
+        self.update_progress(sum(job.progress for job in jobs) // len(jobs) if jobs else 0)
+
     def update_progress(self, progress):
         """Update the progress bar."""
         self.progress_bar.setValue(progress)
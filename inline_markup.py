@@ -0,0 +1,62 @@
+"""Inline span markup for translating a paragraph's runs in one segment.
+
+Each run's text is wrapped in <span id="N"> so the service translates the paragraph as a whole
+(with the html text type) while the markers tell us which part of the translation belongs to
+which run.
+"""
+import html
+import re
+
+SPAN_TAG_PATTERN = re.compile(r'<span\s+id="?(\d+)"?\s*>|</span\s*>')
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def build_tagged_segment(run_texts):
+    """Return the HTML segment for a paragraph whose runs hold run_texts."""
+    if len(run_texts) == 1:
+        # A single run needs no markers
+        return html.escape(run_texts[0], quote=False)
+    return ''.join(f'<span id="{index}">{html.escape(text, quote=False)}</span>'
+                   for index, text in enumerate(run_texts))
+
+
+def parse_tagged_segment(translated_segment, run_count):
+    """Split a translated HTML segment back into one text per run.
+
+    Text outside any span is kept with the run before it, or the first run if there is none,
+    so nothing the service returns is lost even if it moves or drops markers.
+    """
+    run_texts = [''] * run_count
+    current_run = 0
+    position = 0
+    for match in SPAN_TAG_PATTERN.finditer(translated_segment):
+        run_texts[current_run] += translated_segment[position:match.start()]
+        if match.group(1) is not None and int(match.group(1)) < run_count:
+            current_run = int(match.group(1))
+        position = match.end()
+    run_texts[current_run] += translated_segment[position:]
+    return [html.unescape(text) for text in run_texts]
+
+
+def get_run_text(text_elements):
+    """Return the text of a run given its text elements (w:t or a:t)."""
+    return ''.join(element.text or '' for element in text_elements)
+
+
+def write_tagged_segment(text_runs, translated_segment, preserve_space=False):
+    """Write each run's part of a translated segment into that run's text elements in place.
+
+    text_runs holds one list of text elements per run, in the order the segment was built.
+    The translation goes into a run's first text element and the others are emptied, so the
+    run's formatting and any non-text content stay untouched. preserve_space sets
+    xml:space="preserve", which WordprocessingML needs to keep leading and trailing spaces.
+    """
+    translated_texts = parse_tagged_segment(translated_segment, len(text_runs))
+    for text_elements, translated_text in zip(text_runs, translated_texts):
+        if translated_text == get_run_text(text_elements):
+            continue
+        text_elements[0].text = translated_text
+        if preserve_space:
+            text_elements[0].set(XML_SPACE, 'preserve')
+        for text_element in text_elements[1:]:
+            text_element.text = ''
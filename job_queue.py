@@ -0,0 +1,140 @@
+"""Queue of translation jobs for the GUI, with a configurable number running at once and cancellation.
+
+Jobs share the process-wide worker pool, request throttle and translation client. One more job
+is started than there are translation slots, so the next document is already being parsed while
+the others send their requests.
+"""
+import threading
+from collections import deque
+from request_throttle import TranslationCancelled
+from translation_runner import run_translation_app
+
+DEFAULT_CONCURRENT_JOBS = 2
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "Done"
+PARTIAL = "Partial"  # Saved with some segments left untranslated
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+
+class TranslationSlots:
+    """Semaphore whose limit can change while jobs hold it."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.in_use < self.limit, timeout):
+                return False
+            self.in_use += 1
+            return True
+
+    def release(self):
+        with self.condition:
+            self.in_use -= 1
+            self.condition.notify_all()
+
+    def set_limit(self, limit):
+        with self.condition:
+            self.limit = limit
+            self.condition.notify_all()
+
+
+class TranslationJob:
+    def __init__(self, input_path, output_path, target_lang):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.target_lang = target_lang
+        self.status = QUEUED
+        self.progress = 0
+        self.cancel_event = threading.Event()
+
+
+class TranslationJobQueue:
+    def __init__(self, max_concurrent_jobs=DEFAULT_CONCURRENT_JOBS, update_callback=None, **options):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.translation_slots = TranslationSlots(max_concurrent_jobs)
+        self.update_callback = update_callback  # Called as (job, message) from worker threads whenever a job changes
+        self.options = options  # Passed on to every translator, e.g. engine or use_translation_memory
+        self.pending = deque()
+        self.running = set()
+        self.lock = threading.Lock()
+
+    def set_max_concurrent_jobs(self, max_concurrent_jobs):
+        with self.lock:
+            self.max_concurrent_jobs = max_concurrent_jobs
+            self.translation_slots.set_limit(max_concurrent_jobs)
+            self.start_jobs()
+
+    def submit(self, job):
+        with self.lock:
+            self.pending.append(job)
+            self.start_jobs()
+        self.notify(job)
+        return job
+
+    def cancel(self, job):
+        """Cancel a queued job, or stop a running one's pending and in-flight requests."""
+        job.cancel_event.set()
+        with self.lock:
+            if job not in self.pending:
+                return
+            self.pending.remove(job)
+        self.finish(job, CANCELLED, "Cancelled before it started.")
+
+    def cancel_all(self):
+        with self.lock:
+            jobs = list(self.pending) + list(self.running)
+        for job in jobs:
+            self.cancel(job)
+
+    def start_jobs(self):
+        # Called with the lock held. One job beyond the translation slots runs, to parse the next document early
+        while self.pending and len(self.running) < self.max_concurrent_jobs + 1:
+            job = self.pending.popleft()
+            self.running.add(job)
+            job.status = RUNNING
+            threading.Thread(target=self.run_job, args=(job,), name="translation-job", daemon=True).start()
+
+    def run_job(self, job):
+        def progress_callback(progress):
+            job.progress = progress
+            self.notify(job)
+
+        self.notify(job)
+        try:
+            app = run_translation_app(job.input_path, job.output_path, job.target_lang,
+                                      progress_callback=progress_callback, cancel_event=job.cancel_event,
+                                      translation_slots=self.translation_slots, **self.options)
+            output_paths = ', '.join(app.output_paths.values())
+            if isinstance(app.error, TranslationCancelled):
+                self.finish(job, CANCELLED, "Cancelled.")
+            elif app.error is not None:
+                self.finish(job, FAILED, f"Error: {app.error}")
+            elif app.failed_texts:
+                job.progress = 100
+                self.finish(job, PARTIAL, f"Translated to {output_paths}, but {len(app.failed_texts)} segments "
+                                          f"could not be translated")
+            else:
+                job.progress = 100
+                self.finish(job, DONE, f"Translated to {output_paths}")
+        except Exception as e:
+            self.finish(job, FAILED, f"Error: {e}")
+        finally:
+            with self.lock:
+                self.running.discard(job)
+                self.start_jobs()
+
+    def finish(self, job, status, message):
+        job.status = status
+        self.notify(job, message)
+
+    def notify(self, job, message=""):
+        """Report a change to the job; the message goes with the update rather than onto the shared job."""
+        if self.update_callback:
+            self.update_callback(job, message)
@@ -0,0 +1,192 @@
+"""Direct access to the XML parts of an Office Open XML (.docx, .xlsx, .pptx) package.
+
+Only the parts a translator asks for are parsed; every other part is carried over to the
+output as it is. Untouched parts, such as media and embedded files, are copied as their raw
+compressed bytes without being decompressed, so saving is bounded by disk bandwidth and memory
+does not grow with their size.
+"""
+import os
+import posixpath
+import shutil
+import struct
+import zipfile
+import zlib
+from lxml import etree
+
+CONTENT_TYPES_NAME = "[Content_Types].xml"
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+XML_PARSER = etree.XMLParser(huge_tree=True, resolve_entities=False)
+
+# ZIP record layouts (see APPNOTE.TXT); the same ones the zipfile module uses
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+CENTRAL_DIRECTORY_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<4s4H2LH")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+CENTRAL_DIRECTORY_SIGNATURE = b"PK\x01\x02"
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = b"PK\x05\x06"
+DATA_DESCRIPTOR_FLAG = 0x08
+UTF8_NAME_FLAG = 0x800
+ZIP32_LIMIT = 0xFFFFFFFF
+ZIP32_MAX_ENTRIES = 0xFFFF
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class OOXMLPackage:
+    def __init__(self, path):
+        self.path = path
+        self.parts = {}  # Part name -> parsed root element of every part that was loaded
+
+        with zipfile.ZipFile(path) as archive:
+            self.names = archive.namelist()
+            content_types = etree.fromstring(archive.read(CONTENT_TYPES_NAME), XML_PARSER)
+
+        # Content types are declared per part name (Override) or per file extension (Default)
+        defaults = {element.get("Extension").lower(): element.get("ContentType")
+                    for element in content_types.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Default")}
+        overrides = {element.get("PartName").lstrip("/"): element.get("ContentType")
+                     for element in content_types.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Override")}
+        self.content_types = {}
+        for name in self.names:
+            extension = posixpath.splitext(name)[1].lstrip(".").lower()
+            content_type = overrides.get(name, defaults.get(extension))
+            if content_type:
+                self.content_types[name] = content_type
+
+    def find_parts(self, *content_type_suffixes):
+        """Return the names of the parts whose content type ends with one of the suffixes, in package order."""
+        return [name for name in self.names
+                if self.content_types.get(name, "").endswith(content_type_suffixes)]
+
+    def read_part(self, name):
+        """Return a part's raw bytes without parsing it."""
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.read(name)
+
+    def part_contains(self, name, data):
+        """Return whether a part's raw bytes contain data, decompressing it a chunk at a time."""
+        overlap = b""
+        with zipfile.ZipFile(self.path) as archive, archive.open(name) as part:
+            while chunk := part.read(COPY_CHUNK_SIZE):
+                # Keep the end of the previous chunk so a match split across chunks is found
+                if data in overlap + chunk:
+                    return True
+                overlap = chunk[-(len(data) - 1):] if len(data) > 1 else b""
+        return False
+
+    def load_part(self, name):
+        """Parse an XML part once and return its root element. Loaded parts are written back on save."""
+        if name not in self.parts:
+            self.parts[name] = etree.fromstring(self.read_part(name), XML_PARSER)
+        return self.parts[name]
+
+    def serialize_part(self, name):
+        return etree.tostring(self.parts[name], xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    def save(self, output_path):
+        """Write the package to output_path with the loaded parts re-serialized.
+
+        Every other part's compressed bytes are copied straight from the source package. The
+        package is written to a temporary file next to output_path and moved into place at the
+        end, so output_path may be the source package itself.
+        """
+        with zipfile.ZipFile(self.path) as source:
+            infos = source.infolist()
+        new_parts = {name: self.serialize_part(name) for name in self.parts}
+
+        temporary_path = output_path + ".tmp"
+        try:
+            # Packages past the classic ZIP limits need ZIP64 records, which zipfile writes for us
+            estimated_size = sum(info.compress_size for info in infos) + sum(map(len, new_parts.values()))
+            if len(infos) > ZIP32_MAX_ENTRIES or estimated_size + len(infos) * 1024 > ZIP32_LIMIT:
+                self.save_zip64(temporary_path, new_parts)
+            else:
+                self.save_zip32(temporary_path, infos, new_parts)
+            os.replace(temporary_path, output_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def save_zip32(self, output_path, infos, new_parts):
+        """Write the package with hand-written ZIP records, copying untouched parts without decompressing them."""
+        entries = []  # (info, flag bits, compress type, CRC, compressed size, size, local header offset)
+        with open(self.path, "rb") as source, open(output_path, "wb") as target:
+            for info in infos:
+                flag_bits = info.flag_bits & ~DATA_DESCRIPTOR_FLAG  # Sizes go in the local header instead
+                offset = target.tell()
+                if info.filename in new_parts:
+                    data = new_parts[info.filename]
+                    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+                    compressed = compressor.compress(data) + compressor.flush()
+                    entry = (info, flag_bits & UTF8_NAME_FLAG, zipfile.ZIP_DEFLATED, zlib.crc32(data),
+                             len(compressed), len(data), offset)
+                    write_local_header(target, *entry[:6])
+                    target.write(compressed)
+                else:
+                    entry = (info, flag_bits, info.compress_type, info.CRC, info.compress_size, info.file_size,
+                             offset)
+                    write_local_header(target, *entry[:6])
+                    copy_raw_data(source, target, info)
+                entries.append(entry)
+            write_central_directory(target, entries)
+
+    def save_zip64(self, output_path, new_parts):
+        """Write the package through zipfile, streaming untouched parts so memory stays flat."""
+        with zipfile.ZipFile(self.path) as source, \
+                zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as target:
+            for info in source.infolist():
+                if info.filename in new_parts:
+                    target.writestr(info, new_parts[info.filename], zipfile.ZIP_DEFLATED)
+                else:
+                    with source.open(info) as source_file, target.open(info, "w", force_zip64=True) as target_file:
+                        shutil.copyfileobj(source_file, target_file, COPY_CHUNK_SIZE)
+
+
+def encode_name(info):
+    return info.orig_filename.encode("utf-8" if info.flag_bits & UTF8_NAME_FLAG else "cp437")
+
+
+def dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def write_local_header(target, info, flag_bits, compress_type, crc, compress_size, file_size):
+    name = encode_name(info)
+    dos_time, dos_date = dos_date_time(info.date_time)
+    target.write(LOCAL_HEADER.pack(LOCAL_HEADER_SIGNATURE, max(info.extract_version, 20), 0, flag_bits,
+                                   compress_type, dos_time, dos_date, crc, compress_size, file_size, len(name), 0))
+    target.write(name)
+
+
+def copy_raw_data(source, target, info):
+    """Copy an entry's compressed bytes from the source archive without decompressing them."""
+    source.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(source.read(LOCAL_HEADER.size))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+    # The data follows the local header's own name and extra field, which can differ from the central directory's
+    source.seek(header[10] + header[11], 1)
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        target.write(chunk)
+        remaining -= len(chunk)
+
+
+def write_central_directory(target, entries):
+    start = target.tell()
+    for info, flag_bits, compress_type, crc, compress_size, file_size, offset in entries:
+        name = encode_name(info)
+        dos_time, dos_date = dos_date_time(info.date_time)
+        target.write(CENTRAL_DIRECTORY_HEADER.pack(
+            CENTRAL_DIRECTORY_SIGNATURE, info.create_version, info.create_system, max(info.extract_version, 20), 0,
+            flag_bits, compress_type, dos_time, dos_date, crc, compress_size, file_size,
+            len(name), 0, len(info.comment), 0, info.internal_attr, info.external_attr, offset))
+        target.write(name)
+        target.write(info.comment)
+    size = target.tell() - start
+    target.write(END_OF_CENTRAL_DIRECTORY.pack(END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0, 0,
+                                               len(entries), len(entries), size, start, 0))
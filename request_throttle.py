@@ -0,0 +1,281 @@
+"""Rate-limit-aware request layer shared by all translators.
+
+Every request passes through a token bucket sized to the character quota, an AIMD
+concurrency limit that halves on throttling and grows back slowly on success, and a
+retry loop with exponential backoff and jitter that honours Retry-After. The asyncio
+engine has its own, much higher concurrency ceiling, since its requests cost no threads.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from translation_metrics import get_metrics
+
+DEFAULT_CHARACTERS_PER_MINUTE = 33000  # Free tier (F0) quota of 2M characters per hour; paid tiers allow more
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_ASYNC_MAX_CONCURRENCY = 256  # Requests in flight from the asyncio engine
+DEFAULT_MAX_RETRIES = 6
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+CANCEL_POLL_SECONDS = 0.1  # How often waits check whether their job was cancelled
+
+_shared_throttle = None
+_shared_throttle_lock = threading.Lock()
+
+
+class TranslationCancelled(Exception):
+    """Raised in a job whose cancel event was set, so it stops sending requests."""
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise TranslationCancelled()
+
+
+def wait_or_cancel(seconds, cancel_event=None):
+    """Sleep for seconds, waking up early to raise TranslationCancelled if the job is cancelled."""
+    if cancel_event is None:
+        time.sleep(seconds)
+    elif cancel_event.wait(seconds):
+        raise TranslationCancelled()
+
+
+async def wait_or_cancel_async(seconds, cancel_event=None):
+    deadline = time.monotonic() + seconds
+    while True:
+        check_cancelled(cancel_event)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, CANCEL_POLL_SECONDS) if cancel_event is not None else remaining)
+
+
+def configure_request_throttle(characters_per_minute=DEFAULT_CHARACTERS_PER_MINUTE,
+                               max_concurrency=DEFAULT_MAX_CONCURRENCY, max_retries=DEFAULT_MAX_RETRIES,
+                               async_max_concurrency=DEFAULT_ASYNC_MAX_CONCURRENCY):
+    """Replace the process-wide throttle, e.g. to match a paid tier's quota."""
+    global _shared_throttle
+    with _shared_throttle_lock:
+        _shared_throttle = RequestThrottle(characters_per_minute, max_concurrency, max_retries, async_max_concurrency)
+        return _shared_throttle
+
+
+def get_request_throttle():
+    """Return the process-wide throttle, creating it with the default quota on first use."""
+    global _shared_throttle
+    with _shared_throttle_lock:
+        if _shared_throttle is None:
+            _shared_throttle = RequestThrottle()
+        return _shared_throttle
+
+
+class TokenBucket:
+    """Token bucket holding up to one minute of character quota."""
+
+    def __init__(self, characters_per_minute):
+        self.capacity = characters_per_minute
+        self.rate = characters_per_minute / 60.0
+        self.tokens = float(characters_per_minute)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, characters_per_minute):
+        """Change the quota in place; characters already taken stay taken."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.capacity = characters_per_minute
+            self.rate = characters_per_minute / 60.0
+            self.tokens = min(self.tokens, self.capacity)
+
+    def reserve(self, characters):
+        """Take characters from the bucket and return how long the caller must wait before sending.
+
+        The full count is always taken, even beyond the bucket's capacity. The bucket then goes
+        into debt, and this request and the ones after it wait until the debt is paid off, so
+        the average rate never exceeds the quota.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= characters
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def wake_waiter(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit with additive increase on success and multiplicative decrease on throttling.
+
+    Until the first throttled request the limit grows by a slot per success, doubling every
+    window, so a high ceiling is reached quickly; after that it grows by about a slot per window.
+    """
+
+    def __init__(self, max_limit=DEFAULT_MAX_CONCURRENCY, initial_limit=4):
+        self.max_limit = max_limit
+        self.limit = float(min(initial_limit, max_limit))
+        self.slow_start = True
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.async_waiters = deque()  # (event loop, future) of every coroutine waiting for a slot
+
+    def acquire(self, cancel_event=None):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait(CANCEL_POLL_SECONDS if cancel_event is not None else None)
+                check_cancelled(cancel_event)
+            self.in_flight += 1
+
+    async def acquire_async(self, cancel_event=None):
+        """Wait for a slot without blocking the event loop.
+
+        Waiting coroutines sleep on a future until a release wakes them; a cancelled job's
+        tasks are cancelled by its translator, which also abandons the wait.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            check_cancelled(cancel_event)
+            with self.condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self.async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass on a wake-up this task may have been given but will not use
+                with self.condition:
+                    self.wake_async_waiters()
+                raise
+
+    def release(self, throttled=False):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self.slow_start = False
+            elif self.slow_start:
+                self.limit = min(self.max_limit, self.limit + 1)
+            else:
+                # Grow by about one slot per window of successful requests
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+            self.wake_async_waiters()
+
+    def wake_async_waiters(self):
+        """Wake as many waiting coroutines as there are free slots. Called with the condition held."""
+        free_slots = int(self.limit) - self.in_flight
+        while free_slots > 0 and self.async_waiters:
+            loop, waiter = self.async_waiters.popleft()
+            if waiter.done():
+                continue  # Its task was cancelled
+            try:
+                loop.call_soon_threadsafe(wake_waiter, waiter)
+                free_slots -= 1
+            except RuntimeError:
+                pass  # Its event loop has closed
+
+
+def retry_delay(attempt, error):
+    """Return the wait before the next attempt, preferring the service's Retry-After header."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt))
+
+
+def is_retryable(error):
+    # Imported here so loading the request layer does not pull in the Azure SDK at startup
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+    if isinstance(error, HttpResponseError) and error.status_code is not None:
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ServiceRequestError, ServiceResponseError))
+
+
+class RequestThrottle:
+    def __init__(self, characters_per_minute=DEFAULT_CHARACTERS_PER_MINUTE, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, async_max_concurrency=DEFAULT_ASYNC_MAX_CONCURRENCY):
+        self.bucket = TokenBucket(characters_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        # Requests awaited on an event loop hold no thread, so the asyncio engine gets its own, higher ceiling
+        self.async_concurrency = AdaptiveConcurrency(async_max_concurrency, initial_limit=DEFAULT_MAX_CONCURRENCY)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.metrics = get_metrics()
+
+    def set_characters_per_minute(self, characters_per_minute):
+        """Match the quota of the subscription in use while requests keep flowing."""
+        self.bucket.set_rate(characters_per_minute)
+
+    def count_request(self, characters, start):
+        self.metrics.increment("requests")
+        self.metrics.increment("characters_sent", characters)
+        self.metrics.observe("request_seconds", time.perf_counter() - start)
+
+    def count_retry(self, error):
+        with self.lock:
+            self.retries += 1
+            if getattr(error, "status_code", None) == 429:
+                self.throttled += 1
+        self.metrics.increment("retries")
+
+    def call(self, send, characters, cancel_event=None):
+        """Call send() within the quota, retrying throttled and transient failures.
+
+        Setting cancel_event stops any wait for quota, a free slot or a retry and raises TranslationCancelled.
+        """
+        for attempt in range(self.max_retries + 1):
+            check_cancelled(cancel_event)
+            wait_or_cancel(self.bucket.reserve(characters), cancel_event)
+            self.concurrency.acquire(cancel_event)
+            throttled = False
+            start = time.perf_counter()
+            try:
+                return send()
+            except Exception as e:
+                throttled = getattr(e, "status_code", None) == 429
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self.count_retry(e)
+                delay = retry_delay(attempt, e)
+            finally:
+                self.count_request(characters, start)
+                self.concurrency.release(throttled)
+            wait_or_cancel(delay, cancel_event)
+
+    async def call_async(self, send, characters, cancel_event=None):
+        """Await send() within the quota, retrying throttled and transient failures."""
+        for attempt in range(self.max_retries + 1):
+            check_cancelled(cancel_event)
+            await wait_or_cancel_async(self.bucket.reserve(characters), cancel_event)
+            await self.async_concurrency.acquire_async(cancel_event)
+            throttled = False
+            start = time.perf_counter()
+            try:
+                return await send()
+            except Exception as e:
+                throttled = getattr(e, "status_code", None) == 429
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self.count_retry(e)
+                delay = retry_delay(attempt, e)
+            finally:
+                self.count_request(characters, start)
+                self.async_concurrency.release(throttled)
+            await wait_or_cancel_async(delay, cancel_event)
@@ -0,0 +1,43 @@
+"""Pre-translation filter that passes non-linguistic segments straight through.
+
+Formulas, numbers, dates, URLs, email addresses, codes and SKUs, and template placeholders come
+out of the service unchanged at best and corrupted at worst, so they are recognised with one
+precompiled pattern and never sent.
+"""
+import html
+import re
+from inline_markup import SPAN_TAG_PATTERN
+
+UNTRANSLATABLE_PATTERNS = {
+    "formula": r"=.*",
+    "number": r"[-+(]?[$€£¥]?\s?\d[\d.,' ]*(?:[eE][-+]?\d+)?\s?[%‰]?\)?\s?(?:[$€£¥]|[A-Z]{3})?",
+    "date": r"\d{1,4}[-./]\d{1,2}[-./]\d{1,4}(?:[ T]\d{1,2}:\d{2}(?::\d{2})?)?"
+            r"|\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?",
+    "url": r"(?:https?://|ftp://|www\.)\S+",
+    "email": r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+",
+    # Upper-case letters and digits with at least one digit, e.g. AB-1234 or X200/5
+    "code": r"(?=[A-Z_./#-]*\d)[A-Z0-9]+(?:[_./#-][A-Z0-9]+)*",
+    "placeholder": r"(?:\{\{?\s*[\w.]+\s*\}\}?|\$\{\w+\}|%\(\w+\)[sd]|%[sdif]|<<\w+>>|\[\[\w+\]\]|\s)+",
+    # Nothing but punctuation, symbols and spaces
+    "symbols": r"[\W_]*",
+}
+UNTRANSLATABLE_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in UNTRANSLATABLE_PATTERNS.items()), re.DOTALL
+)
+
+
+def get_plain_text(text, text_type="plain"):
+    """Return the text a segment shows, without the span markers of html segments."""
+    if text_type == "html":
+        return html.unescape(SPAN_TAG_PATTERN.sub("", text))
+    return text
+
+
+def classify_segment(text, text_type="plain"):
+    """Return the kind of non-translatable content the whole segment is, or None if it should be translated."""
+    match = UNTRANSLATABLE_PATTERN.fullmatch(get_plain_text(text, text_type).strip())
+    return match.lastgroup if match else None
+
+
+def is_translatable(text, text_type="plain"):
+    return classify_segment(text, text_type) is None
@@ -0,0 +1,103 @@
+"""Sidecar segment manifests for incremental re-translation of revised documents.
+
+A manifest records, for every segment of a translated document, its locator, a hash of its
+source text and its translation. When the next revision is translated, segments are aligned
+with the previous manifest by position and content hash and only new or changed ones are sent
+to the service.
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def get_manifest_path(output_path):
+    return output_path + MANIFEST_SUFFIX
+
+
+def segment_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SegmentManifest:
+    def __init__(self, segments=None):
+        self.segments = segments or []  # Dicts with locator, hash and translations by target language
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version in {path}")
+        return cls(data["segments"])
+
+    @classmethod
+    def build(cls, locators, texts, translations, failed_texts=()):
+        """Build a manifest for this run, leaving out segments whose request failed.
+
+        translations maps each target language to the translations of texts in order.
+        """
+        return cls([{"locator": locator, "hash": segment_hash(text),
+                     "translations": {target_lang: translated_texts[index]
+                                      for target_lang, translated_texts in translations.items()}}
+                    for index, (locator, text) in enumerate(zip(locators, texts))
+                    if text not in failed_texts])
+
+    def save(self, path):
+        # Write to a temporary file first so an interrupted run never leaves a broken manifest
+        temporary_path = path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": MANIFEST_VERSION, "segments": self.segments}, file, ensure_ascii=False)
+        os.replace(temporary_path, path)
+
+    def match(self, locators, texts, target_lang):
+        """Return a dict mapping the index of each unchanged segment to its previous translation.
+
+        A segment is unchanged if the previous revision had the same text at the same locator,
+        or failing that, the same text anywhere else (moved or copied content). Only segments
+        previously translated into target_lang are matched.
+        """
+        by_locator = {segment["locator"]: segment for segment in self.segments
+                      if target_lang in segment["translations"]}
+        by_hash = {segment["hash"]: segment["translations"][target_lang] for segment in self.segments
+                   if target_lang in segment["translations"]}
+
+        matches = {}
+        for index, (locator, text) in enumerate(zip(locators, texts)):
+            text_hash = segment_hash(text)
+            previous = by_locator.get(locator)
+            if previous is not None and previous["hash"] == text_hash:
+                matches[index] = previous["translations"][target_lang]
+            elif text_hash in by_hash:
+                matches[index] = by_hash[text_hash]
+        return matches
+
+
+def translate_incrementally(translator, locators, texts, previous_manifest=None):
+    """Translate texts, copying over the translations of segments unchanged since the previous manifest.
+
+    Returns a dict mapping each of the translator's target languages to the translations in order.
+    """
+    reused = {target_lang: previous_manifest.match(locators, texts, target_lang) if previous_manifest else {}
+              for target_lang in translator.target_langs}
+    # A segment is sent again if any target language has no previous translation for it
+    pending = [index for index in range(len(texts))
+               if any(index not in reused[target_lang] for target_lang in translator.target_langs)]
+    if previous_manifest is not None:
+        print(f"Reused {len(texts) - len(pending)} of {len(texts)} segments from the previous translation.")
+
+    translations = {target_lang: [reused[target_lang].get(index) for index in range(len(texts))]
+                    for target_lang in translator.target_langs}
+    new_translations = translator.translate_all([texts[index] for index in pending])
+    for target_lang, translated_texts in new_translations.items():
+        for index, translated_text in zip(pending, translated_texts):
+            translations[target_lang][index] = translated_text
+    return translations
+
+
+def save_manifest(path, translator, locators, texts, translations):
+    """Write the manifest of a finished run for the next revision to build on."""
+    manifest = SegmentManifest.build(locators, texts, translations, translator.failed_texts)
+    manifest.save(path)
@@ -0,0 +1,238 @@
+"""Translation backends used by the translators.
+
+AzureTranslatorBackend talks to the Azure AI Translator service. MockTranslatorBackend is a
+deterministic local stand-in with configurable latency, errors and throttling, so throughput
+can be measured without a subscription.
+"""
+import asyncio
+import atexit
+import random
+import threading
+import time
+from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
+from request_throttle import DEFAULT_ASYNC_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+
+DEFAULT_ENDPOINT = "https://api.cognitive.microsofttranslator.com/"
+DEFAULT_REGION = "westeurope"
+DEFAULT_KEY_PATH = "key.txt"  # The file holding the translator key
+CONNECTION_POOL_SIZE = DEFAULT_MAX_CONCURRENCY  # Keep-alive connections, one per concurrent request
+ASYNC_CONNECTION_POOL_SIZE = DEFAULT_ASYNC_MAX_CONCURRENCY  # The same for the asyncio engine
+
+_shared_backend = None
+_shared_backend_lock = threading.Lock()
+
+
+def get_translation_backend():
+    """Return the process-wide Azure backend, created on first use.
+
+    Every document reuses its client and warm connection pool, so the key is read and the TLS
+    connections are set up once per process instead of once per document.
+    """
+    global _shared_backend
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            _shared_backend = AzureTranslatorBackend()
+        return _shared_backend
+
+
+class TranslationBackend:
+    """Interface every backend implements."""
+
+    def translate(self, texts, target_langs, text_type="plain"):
+        """Translate a batch of texts into every target language in one request.
+
+        Returns a dict mapping each target language to the translations in order. text_type is
+        "plain" or "html"; with "html" markup is kept and only text is translated.
+        """
+        raise NotImplementedError
+
+    def open_async(self):
+        """Return an async context manager yielding an object with an awaitable translate(texts, target_langs, text_type)."""
+        raise NotImplementedError
+
+
+def get_translations_by_language(response, target_langs):
+    """Regroup a Translator response, which lists every language's translation per text, by language."""
+    translations = {target_lang: [] for target_lang in target_langs}
+    for item in response:
+        # Translations come back in the order of to_language
+        for target_lang, translation in zip(target_langs, item.translations):
+            translations[target_lang].append(translation.text)
+    return translations
+
+
+class AzureTranslatorBackend(TranslationBackend):
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, region=DEFAULT_REGION, key_path=DEFAULT_KEY_PATH,
+                 subscription_key=None, async_transport=None):
+        self.endpoint = endpoint
+        self.region = region
+        if subscription_key is None:
+            with open(key_path, 'r', encoding='utf-8') as file:
+                subscription_key = file.read()
+        self.subscription_key = subscription_key
+        self.async_transport = async_transport
+        self.async_client = None  # Created on first use, on the event loop that uses it
+        self.async_loop = None
+
+        # Imported here so starting the app does not load the SDK before the first document
+        import requests
+        from azure.ai.translation.text import TextTranslationClient
+        from azure.core.pipeline.transport import RequestsTransport
+
+        # A connection pool large enough that concurrent requests never drop their keep-alive connections
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=CONNECTION_POOL_SIZE)
+        session.mount("https://", adapter)
+        self.client = TextTranslationClient(
+            endpoint=self.endpoint,
+            credential=AzureKeyCredential(self.subscription_key),
+            headers={"Ocp-Apim-Subscription-Region": self.region},
+            transport=RequestsTransport(session=session),
+            retry_total=0  # Retries are handled by the request throttle
+        )
+
+    def translate(self, texts, target_langs, text_type="plain"):
+        response = self.client.translate(body=texts, to_language=target_langs, text_type=text_type)
+        return get_translations_by_language(response, target_langs)
+
+    def open_async(self):
+        return _AsyncAzureSession(self)
+
+
+def close_async_client(client, loop):
+    """Close an async client kept open for reuse, on the event loop it belongs to. Runs at exit."""
+    if not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+    except Exception:
+        pass  # The process is exiting anyway
+
+
+class _AsyncAzureSession:
+    """Hands out the backend's async client, creating it on the first use.
+
+    The client and its connection pool stay open for the life of the process and belong to the
+    event loop that created them. The asyncio engine runs every job on one shared loop, so all
+    documents reuse them; a different loop gets a client of its own.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        if self.backend.async_client is None or self.backend.async_loop is not loop:
+            self.backend.async_client = self.create_client()
+            self.backend.async_loop = loop
+            atexit.register(close_async_client, self.backend.async_client, loop)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def create_client(self):
+        # Imported here so the sync path does not need the async HTTP stack
+        from azure.ai.translation.text.aio import TextTranslationClient as AsyncTextTranslationClient
+        transport = self.backend.async_transport
+        if transport is None:
+            import aiohttp
+            from azure.core.pipeline.transport import AioHttpTransport
+            # Enough keep-alive connections for every request the asyncio engine may have in flight
+            connector = aiohttp.TCPConnector(limit=ASYNC_CONNECTION_POOL_SIZE)
+            transport = AioHttpTransport(session=aiohttp.ClientSession(connector=connector))
+        return AsyncTextTranslationClient(
+            endpoint=self.backend.endpoint,
+            credential=AzureKeyCredential(self.backend.subscription_key),
+            headers={"Ocp-Apim-Subscription-Region": self.backend.region},
+            transport=transport,
+            retry_total=0  # Retries are handled by the request throttle
+        )
+
+    async def translate(self, texts, target_langs, text_type="plain"):
+        response = await self.backend.async_client.translate(body=texts, to_language=target_langs, text_type=text_type)
+        return get_translations_by_language(response, target_langs)
+
+
+class _MockResponse:
+    """Just enough of an HTTP response for HttpResponseError and the request throttle."""
+
+    def __init__(self, status_code, reason, headers=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers or {}
+
+    def text(self):
+        return ""
+
+
+class MockTranslatorBackend(TranslationBackend):
+    """Deterministic offline backend.
+
+    Translations are the source text prefixed with the target language, so markup is kept.
+    latency is the seconds each request takes, error_rate the share of requests failing with
+    a 500, and characters_per_minute an optional quota above which requests get a 429 with
+    Retry-After.
+    """
+
+    def __init__(self, latency=0.05, error_rate=0.0, characters_per_minute=None, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.characters_per_minute = characters_per_minute
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.segment_count = 0
+        self.character_count = 0
+        self.window_start = time.monotonic()
+        self.window_characters = 0
+
+    def check_request(self, texts, target_langs):
+        """Count the request and raise the error the service would return for it, if any."""
+        # The service bills every target language separately
+        characters = sum(len(text) for text in texts) * len(target_langs)
+        with self.lock:
+            self.request_count += 1
+            if self.characters_per_minute is not None:
+                now = time.monotonic()
+                if now - self.window_start >= 60:
+                    self.window_start = now
+                    self.window_characters = 0
+                if self.window_characters + characters > self.characters_per_minute:
+                    retry_after = max(1, int(60 - (now - self.window_start)))
+                    raise HttpResponseError(message="Mock quota exceeded",
+                                            response=_MockResponse(429, "Too Many Requests",
+                                                                   {"Retry-After": str(retry_after)}))
+                self.window_characters += characters
+            if self.random.random() < self.error_rate:
+                raise HttpResponseError(message="Mock server error", response=_MockResponse(500, "Internal Server Error"))
+            self.segment_count += len(texts)
+            self.character_count += characters
+
+    def mock_translations(self, texts, target_lang):
+        return [f"[{target_lang}] {text}" for text in texts]
+
+    def translate(self, texts, target_langs, text_type="plain"):
+        time.sleep(self.latency)
+        self.check_request(texts, target_langs)
+        return {target_lang: self.mock_translations(texts, target_lang) for target_lang in target_langs}
+
+    def open_async(self):
+        return _AsyncMockSession(self)
+
+
+class _AsyncMockSession:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def translate(self, texts, target_langs, text_type="plain"):
+        await asyncio.sleep(self.backend.latency)
+        self.backend.check_request(texts, target_langs)
+        return {target_lang: self.backend.mock_translations(texts, target_lang) for target_lang in target_langs}
@@ -0,0 +1,69 @@
+"""Append-only checkpoint journal for resuming interrupted translation jobs.
+
+Every finished request appends its translations to a JSON-lines file next to the output.
+A resumed run replays the journal and only translates what is left. The journal is removed
+once the output has been saved with every segment translated.
+"""
+import json
+import os
+import threading
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def get_journal_path(output_path):
+    return output_path + JOURNAL_SUFFIX
+
+
+class TranslationJournal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        # (source text, target language) -> translation, replayed from an earlier run. This run's own
+        # translations are only written to the file, so memory does not grow with the document
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self.replay()
+            if self.entries:
+                print(f"Resuming with {len(self.entries)} segments from {path}.")
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def replay(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short by the crash that interrupted the run
+                    continue
+                self.entries[(entry["source"], entry["target_lang"])] = entry["translation"]
+
+    def lookup(self, texts, target_lang):
+        """Return a dict mapping each text replayed from the journal to its translation."""
+        with self.lock:
+            return {text: self.entries[(text, target_lang)] for text in texts if (text, target_lang) in self.entries}
+
+    def record(self, translations, target_lang):
+        """Append a finished request's translations and flush them to disk."""
+        with self.lock:
+            for source_text, translated_text in translations.items():
+                self.file.write(json.dumps({"source": source_text, "target_lang": target_lang,
+                                            "translation": translated_text}, ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def finish(self, failed_texts):
+        """Close the journal once the output is saved, deleting it unless some segments failed.
+
+        A journal kept after failures lets a resumed run retry just those segments.
+        """
+        self.close()
+        if failed_texts:
+            print(f"{len(failed_texts)} segments could not be translated; resume the job to retry them.")
+        elif os.path.exists(self.path):
+            os.remove(self.path)
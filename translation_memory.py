@@ -0,0 +1,134 @@
+"""Persistent translation memory shared by all translators.
+
+Translations are stored in SQLite keyed by (source text, source language, target language),
+with a bounded in-process LRU front so repeated lookups in a run never touch the disk. The
+translators let the service detect the source language, so they store it as '' (auto-detect).
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MEMORY_PATH = "translation_memory.db"
+DEFAULT_MAX_ENTRIES = 500000  # Rows kept on disk before the least recently used are evicted
+DEFAULT_CACHE_ENTRIES = 20000  # Rows kept in the in-process LRU front
+SQLITE_MAX_PARAMETERS = 500
+
+_shared_memory = None
+_shared_memory_lock = threading.Lock()
+
+
+def get_translation_memory(path=DEFAULT_MEMORY_PATH):
+    """Return the process-wide translation memory, opening it on first use."""
+    global _shared_memory
+    with _shared_memory_lock:
+        if _shared_memory is None:
+            _shared_memory = TranslationMemory(path)
+        return _shared_memory
+
+
+class TranslationMemory:
+    def __init__(self, path=DEFAULT_MEMORY_PATH, max_entries=DEFAULT_MAX_ENTRIES, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.cache_entries = cache_entries
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+        # WAL and a generous busy timeout let several processes share one store
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "source_text TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "translated_text TEXT NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (source_text, source_lang, target_lang))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+        self.connection.commit()
+        self.entry_count = self.count_entries()
+
+    def count_entries(self):
+        return self.connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def remember(self, key, translated_text):
+        """Put an entry in the LRU front, dropping the least recently used one when it is full."""
+        self.cache[key] = translated_text
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_entries:
+            self.cache.popitem(last=False)
+
+    def get_many(self, texts, target_lang, source_lang=''):
+        """Return a dict mapping each text that has a stored translation to that translation."""
+        texts = list(dict.fromkeys(texts))
+        found = {}
+        missing = []
+        with self.lock:
+            for text in texts:
+                key = (text, source_lang, target_lang)
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    found[text] = self.cache[key]
+                else:
+                    missing.append(text)
+
+            now = time.time()
+            for start in range(0, len(missing), SQLITE_MAX_PARAMETERS):
+                chunk = missing[start:start + SQLITE_MAX_PARAMETERS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT source_text, translated_text FROM translations "
+                    f"WHERE source_lang = ? AND target_lang = ? AND source_text IN ({placeholders})",
+                    [source_lang, target_lang, *chunk]
+                ).fetchall()
+                for source_text, translated_text in rows:
+                    found[source_text] = translated_text
+                    self.remember((source_text, source_lang, target_lang), translated_text)
+                self.connection.executemany(
+                    "UPDATE translations SET last_used = ? WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                    [(now, source_text, source_lang, target_lang) for source_text, _ in rows]
+                )
+            self.connection.commit()
+        return found
+
+    def put_many(self, translations, target_lang, source_lang=''):
+        """Store a dict mapping source texts to their translations.
+
+        source_lang '' means the source language was auto-detected, as it is for every translator.
+        """
+        if not translations:
+            return
+        with self.lock:
+            now = time.time()
+            for source_text, translated_text in translations.items():
+                self.remember((source_text, source_lang, target_lang), translated_text)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO translations (source_text, source_lang, target_lang, translated_text, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(source_text, source_lang, target_lang, translated_text, now)
+                 for source_text, translated_text in translations.items()]
+            )
+            # An estimate: replaced rows count as new and other processes' inserts are missed. evict()
+            # recounts before deleting anything, which keeps a full count off the path of every request
+            self.entry_count += len(translations)
+            self.evict()
+            self.connection.commit()
+
+    def evict(self):
+        """Delete the least recently used rows once the store grows past max_entries."""
+        if self.entry_count <= self.max_entries:
+            return
+        self.entry_count = self.count_entries()
+        if self.entry_count <= self.max_entries:
+            return
+        # Evict down to 90% of the limit so eviction does not run on every insert
+        excess = self.entry_count - int(self.max_entries * 0.9)
+        self.connection.execute(
+            "DELETE FROM translations WHERE rowid IN "
+            "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.entry_count -= excess
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
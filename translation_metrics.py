@@ -0,0 +1,158 @@
+"""Thread-safe metrics and coalesced progress events for translation jobs.
+
+Counters track requests, characters sent, retries, cache hits and segments; histograms time the
+parse, translate, write-back and save phases and individual requests. Everything can be exported
+as JSON or in the Prometheus text format.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_PROGRESS_INTERVAL = 0.2  # Seconds between progress events
+METRIC_PREFIX = "document_translator"
+
+COUNTERS = {
+    "requests": "Translation requests sent",
+    "characters_sent": "Characters sent for translation",
+    "retries": "Requests retried after throttling or transient errors",
+    "cache_hits": "Segments served from the translation memory or checkpoint journal",
+    "cache_misses": "Segments that needed a request",
+    "segments": "Segments extracted from documents",
+    "unique_segments": "Distinct segments after in-document deduplication",
+    "failed_segments": "Segments left untranslated after their request failed",
+    "skipped_segments": "Non-translatable segments (formulas, numbers, dates, URLs, codes) passed through",
+    "skipped_characters": "Characters not sent because their segments were non-translatable",
+    "requests_saved": "Requests not sent because their segments were non-translatable",
+    "documents": "Documents translated",
+}
+HISTOGRAMS = {
+    "parse_seconds": "Time spent loading documents and extracting segments",
+    "translate_seconds": "Time spent translating a document's segments",
+    "write_back_seconds": "Time spent writing translations into documents",
+    "save_seconds": "Time spent saving translated documents",
+    "request_seconds": "Duration of individual translation requests",
+}
+
+_shared_metrics = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            _shared_metrics = TranslationMetrics()
+        return _shared_metrics
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+    def snapshot(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "buckets": dict(zip((str(bound) for bound in self.buckets), self.bucket_counts))}
+
+    def merge(self, snapshot):
+        self.count += snapshot["count"]
+        self.sum += snapshot["sum"]
+        for index, bound in enumerate(self.buckets):
+            self.bucket_counts[index] += snapshot["buckets"].get(str(bound), 0)
+
+
+class TranslationMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram() for name in HISTOGRAMS}
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def observe(self, name, value):
+        with self.lock:
+            self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the body of a with block into the named histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self.lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.histograms = {name: Histogram() for name in HISTOGRAMS}
+
+    def snapshot(self):
+        with self.lock:
+            return {"counters": dict(self.counters),
+                    "histograms": {name: histogram.snapshot() for name, histogram in self.histograms.items()}}
+
+    def merge(self, snapshot):
+        """Add a snapshot taken in another process, e.g. a CLI worker."""
+        with self.lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] += value
+            for name, histogram in snapshot["histograms"].items():
+                self.histograms[name].merge(histogram)
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in snapshot["counters"].items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines += [f"# HELP {metric} {COUNTERS[name]}", f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, histogram in snapshot["histograms"].items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines += [f"# HELP {metric} {HISTOGRAMS[name]}", f"# TYPE {metric} histogram"]
+            lines += [f'{metric}_bucket{{le="{bound}"}} {count}' for bound, count in histogram["buckets"].items()]
+            lines += [f'{metric}_bucket{{le="+Inf"}} {histogram["count"]}',
+                      f"{metric}_sum {histogram['sum']}", f"{metric}_count {histogram['count']}"]
+        return "\n".join(lines) + "\n"
+
+
+class ProgressCoalescer:
+    """Wraps a progress callback so it fires at most once per interval, and only when the value changes.
+
+    Reaching 100 or dropping back (an error reset) is always passed through straight away.
+    """
+
+    def __init__(self, callback, interval=DEFAULT_PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self.last_value = None
+        self.last_time = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, progress):
+        with self.lock:
+            now = time.monotonic()
+            if progress == self.last_value:
+                return
+            is_final = progress >= 100 or (self.last_value is not None and progress < self.last_value)
+            if not is_final and now - self.last_time < self.interval:
+                return
+            self.last_value = progress
+            self.last_time = now
+        self.callback(progress)
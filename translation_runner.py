@@ -0,0 +1,55 @@
+"""Helpers shared by the command line and the GUI for running the translator that fits a document."""
+import os
+import re
+
+SUPPORTED_TYPES = ("docx", "xlsx", "pptx")
+# Names get_output_path gives translations, with the language code that several target languages add
+GENERATED_OUTPUT_PATTERN = re.compile(r"-translated(\.[a-z]{2,3}(-[a-z]{2,4})?)?\.(docx|xlsx|pptx)$", re.IGNORECASE)
+
+
+def get_document_type(path):
+    """Work out the document type from the file extension, the same way the GUI does."""
+    return path.split('.')[-1].lower()
+
+
+def get_output_path(input_path, output_dir=None, input_root=None):
+    """Return where the translation of input_path is written, named like the GUI's default.
+
+    With an input_root, the input's directory relative to it is mirrored under output_dir, so
+    documents with the same name in different folders do not overwrite each other.
+    """
+    base_name, extension = os.path.splitext(os.path.basename(input_path))
+    directory = output_dir or os.path.dirname(input_path)
+    if output_dir and input_root:
+        directory = os.path.normpath(os.path.join(output_dir, os.path.relpath(os.path.dirname(input_path), input_root)))
+    return os.path.join(directory, f"{base_name}-translated{extension}")
+
+
+def get_output_keys(output_path, target_lang):
+    """Return the normalized path of every output a job writes, for finding jobs that would overwrite each other."""
+    # Imported here so the GUI starts without loading the translators
+    from batch_translator import get_target_languages
+    from document_translator import get_language_output_paths
+    output_paths = get_language_output_paths(output_path, get_target_languages(target_lang)).values()
+    return {os.path.normcase(os.path.abspath(path)) for path in output_paths}
+
+
+def run_translation_app(input_path, output_path, target_lang, **options):
+    """Run the translator for the document's type and return it, with the run's outcome in its error and failed_texts.
+
+    Format handlers are imported here so each worker only loads what it needs.
+    """
+    document_type = get_document_type(input_path)
+    if document_type == "docx":
+        from word_translator import WordTranslationApp
+        return WordTranslationApp(input_path=input_path, output_path=output_path, target_lang=target_lang, **options)
+    elif document_type == "xlsx":
+        from excel_translator import ExcelTranslationApp
+        return ExcelTranslationApp(input_path=input_path, output_path=output_path, target_lang=target_lang, **options)
+    elif document_type == "pptx":
+        from powerpoint_translator import PowerPointTranslationApp
+        return PowerPointTranslationApp(input_path=input_path, output_path=output_path, target_lang=target_lang,
+                                        **options)
+    else:
+        raise ValueError(f"Unsupported document type: {document_type}")
+
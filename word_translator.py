@@ -1,110 +1,67 @@
-import threading
-from docx import Document
-from azure.ai.translation.text import TextTranslationClient
-from azure.core.credentials import AzureKeyCredential
+from document_translator import DocumentTranslationApp
+from ooxml_package import OOXMLPackage
 
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_PARAGRAPH = f"{{{W_NAMESPACE}}}p"
+W_RUN = f"{{{W_NAMESPACE}}}r"
+W_TEXT = f"{{{W_NAMESPACE}}}t"
 
-class WordTranslationApp:
-    def __init__(self, input_path, output_path, target_lang="en", progress_callback=None):
-        self.input_path = input_path
-        self.output_path = output_path
-        self.target_language_code = target_lang
-        self.progress_callback = progress_callback
+# Parts holding translatable text: the document body (including tables and text boxes),
+# headers, footers, footnotes and endnotes
+WORD_TEXT_CONTENT_TYPES = (
+    "document.main+xml", "document.macroEnabled.main+xml", "template.main+xml", "template.macroEnabledTemplate.main+xml",
+    "wordprocessingml.header+xml", "wordprocessingml.footer+xml",
+    "wordprocessingml.footnotes+xml", "wordprocessingml.endnotes+xml",
+)
 
-        # Set up Azure Translator credentials
-        self.endpoint = "https://api.cognitive.microsofttranslator.com/"
-        key_path = "key.txt"  # The file holding the translator key
-        with open(key_path, 'r', encoding='utf-8') as file:
-            self.subscription_key = file.read()
-        self.region = "westeurope"
-        self.client = TextTranslationClient(
-            endpoint=self.endpoint,
-            credential=AzureKeyCredential(self.subscription_key),
-            headers={"Ocp-Apim-Subscription-Region": self.region}
-        )
+
+class WordTranslationApp(DocumentTranslationApp):
+    def __init__(self, input_path, output_path, target_lang="en", progress_callback=None, **options):
+        super().__init__(input_path, output_path, target_lang, progress_callback, **options)
 
         # Start the translation process
         self.translate_document()
 
-    def translate_paragraph(self, paragraph, client, target_lang='en'):
-        """Translate a single paragraph."""
-        print(f"Processing paragraph: {paragraph.text}")
-        translated_runs = []
-        current_run_text = ''
-
-        for run in paragraph.runs:
-            if run.text.strip():
-                current_run_text += run.text
-            else:
-                translated_runs.append(run)
-
-        if current_run_text:
-            try:
-                response = client.translate(
-                    body=[current_run_text], to_language=[target_lang]
-                )
-                translated_text = response[0].translations[0].text
-                print(f"Translated text: {translated_text}")
-
-                translated_run = paragraph.add_run(translated_text)
-                # Preserve formatting from the last run
-                if paragraph.runs:
-                    last_run = paragraph.runs[-1]
-                    translated_run.bold = last_run.bold
-                    translated_run.italic = last_run.italic
-                    translated_run.underline = last_run.underline
-                    translated_run.font.size = last_run.font.size
-                    translated_run.font.color.rgb = last_run.font.color.rgb
-                    translated_run.font.name = last_run.font.name
-                    translated_run.font.highlight_color = last_run.font.highlight_color
-
-                translated_runs.append(translated_run)
-            except Exception as e:
-                print(f"Error translating text: {current_run_text}, Error: {e}")
-
-        # Clear and rebuild the paragraph
-        paragraph.clear()
-        for translated_run in translated_runs:
-            new_run = paragraph.add_run(translated_run.text)
-            new_run.bold = translated_run.bold
-            new_run.italic = translated_run.italic
-            new_run.underline = translated_run.underline
-            new_run.font.size = translated_run.font.size
-            new_run.font.color.rgb = translated_run.font.color.rgb
-            new_run.font.name = translated_run.font.name
-            new_run.font.highlight_color = translated_run.font.highlight_color
-
-        return paragraph
-
-    def process_paragraphs(self, doc, client, target_lang='en'):
-        threads = []
-        total_paragraphs = len(doc.paragraphs)
-        progress_counter = [0]
-
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                thread = threading.Thread(target=self.translate_paragraph, args=(paragraph, client, target_lang))
-                thread.start()
-                threads.append((thread, paragraph))
-
-        for thread, paragraph in threads:
-            thread.join()
-            progress_counter[0] += 1
-            if self.progress_callback:
-                progress = int((progress_counter[0] / total_paragraphs) * 100)
-                self.progress_callback(progress)
+    def get_text_runs(self, paragraph):
+        """Return the w:t elements of each run that belongs directly to the paragraph and holds text.
+
+        Runs inside a text box belong to the text box's own paragraphs and are skipped here.
+        Tabs, breaks, drawings and deleted text live outside w:t and are left alone.
+        """
+        text_runs = []
+        for run in paragraph.iter(W_RUN):
+            if next(run.iterancestors(W_PARAGRAPH)) is not paragraph:
+                continue
+            text_elements = run.findall(W_TEXT)
+            if any(element.text for element in text_elements):
+                text_runs.append(text_elements)
+        return text_runs
+
+    def extract_segments(self, package):
+        """Walk every text-bearing part once and return the paragraphs to translate.
+
+        Each segment is a (locator, text_runs) pair, where the locator "part#index" names the
+        paragraph's position in its part and text_runs holds each run's w:t elements.
+        """
+        segments = []
+        for part_name in package.find_parts(*WORD_TEXT_CONTENT_TYPES):
+            for index, paragraph in enumerate(package.load_part(part_name).iter(W_PARAGRAPH)):
+                text_runs = self.get_text_runs(paragraph)
+                if any((element.text or '').strip() for text_elements in text_runs for element in text_elements):
+                    segments.append((f"{part_name}#{index}", text_runs))
+        return segments
 
     def translate_document(self):
-        if not self.input_path or not self.output_path or not self.target_language_code:
-            print("Error: Please provide all required paths and target language.")
+        if not self.has_required_options():
             return
 
-        try:
-            doc = Document(self.input_path)
-            self.process_paragraphs(doc, self.client, self.target_language_code)
-            doc.save(self.output_path)
-            print(f"Document has been translated and saved as {self.output_path}.")
-        except Exception as e:
-            print(f"Error: An error occurred: {e}")
-            if self.progress_callback:
-                self.progress_callback(0)
+        with self.journaled_run():
+            with self.metrics.timer("parse_seconds"):
+                package = OOXMLPackage(self.input_path)
+                segments = self.extract_segments(package)
+
+            # Send each paragraph as one segment with a span per run, all paragraphs in batched requests
+            translated_segments = self.translate_segments(segments)
+
+            # The parsed package is reused for every language: write its translations in place, then save
+            self.save_translations(package, segments, translated_segments, preserve_space=True)
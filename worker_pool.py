@@ -0,0 +1,71 @@
+"""Process-wide bounded worker pool shared by all translators."""
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from request_throttle import CANCEL_POLL_SECONDS
+
+DEFAULT_MAX_WORKERS = 8  # Concurrent requests across every document in the process
+DEFAULT_MAX_IN_FLIGHT = 4  # Concurrent requests for a single document
+
+_executor = None
+_max_workers = DEFAULT_MAX_WORKERS
+_executor_lock = threading.Lock()
+
+
+def configure(max_workers=DEFAULT_MAX_WORKERS):
+    """Set the size of the shared pool. Takes effect the next time the pool is created."""
+    global _executor, _max_workers
+    with _executor_lock:
+        _max_workers = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def get_executor():
+    """Return the shared executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="translator")
+        return _executor
+
+
+class BoundedWorkQueue:
+    """Runs one document's tasks on the shared pool with a cap on how many are in flight at once."""
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, executor=None):
+        self.max_in_flight = max(1, max_in_flight)
+        # Without an executor of its own the shared pool is looked up on every submit, so configure() can resize it
+        self.executor = executor
+
+    def run(self, function, items, cancel_event=None):
+        """Call function on every item and yield (item, future) pairs as they complete.
+
+        New items are only submitted once a slot frees up, so the caller never queues
+        more than max_in_flight tasks no matter how many items there are. Once cancel_event
+        is set, tasks that have not started are cancelled and the generator stops without
+        waiting for the running ones.
+        """
+        pending = {}
+        try:
+            for item in items:
+                while len(pending) >= self.max_in_flight:
+                    yield from self.collect_done(pending, cancel_event)
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                pending[(self.executor or get_executor()).submit(function, item)] = item
+
+            while pending:
+                yield from self.collect_done(pending, cancel_event)
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def collect_done(self, pending, cancel_event=None):
+        """Yield the pending tasks that complete; with a cancel_event, give up after CANCEL_POLL_SECONDS to check it."""
+        done, _ = wait(pending, timeout=CANCEL_POLL_SECONDS if cancel_event is not None else None,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future